@@ -0,0 +1,200 @@
+import os
+import struct
+import sqlite3
+import zipfile
+import zlib
+import logging
+import argparse
+import threading
+from datetime import datetime
+
+# Persistent index of the option tick archive.
+#
+# Maps (trading date, contract) -> monthly ZIP path, inner daily ZIP member and
+# the CSV's local-header offset / compressed size inside that inner ZIP, so
+# zip_read can seek straight to the bytes of one CSV without scanning
+# outer_zip.namelist() or parsing the inner ZIP's central directory.
+# Monthly ZIPs are re-indexed only when their size or mtime changes.
+
+index_path = os.getenv("ARCHIVE_INDEX_PATH", "archive_index.db")
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS monthly_zips (
+    outer_path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS members (
+    trade_date TEXT NOT NULL,
+    contract TEXT NOT NULL,
+    outer_path TEXT NOT NULL,
+    inner_name TEXT NOT NULL,
+    csv_name TEXT NOT NULL,
+    header_offset INTEGER NOT NULL,
+    compress_size INTEGER NOT NULL,
+    file_size INTEGER NOT NULL,
+    compress_type INTEGER NOT NULL,
+    crc INTEGER,
+    PRIMARY KEY (trade_date, contract)
+);
+CREATE INDEX IF NOT EXISTS ix_members_outer_path ON members (outer_path);
+"""
+
+LOCAL_HEADER = struct.Struct("<4s2B4HL2L2H")
+LOCAL_HEADER_SIGNATURE = b"PK\x03\x04"
+
+
+class ArchiveIndex:
+    """SQLite-backed lookup table for the nested option ZIP archive"""
+
+    def __init__(self, path=None):
+        self.path = path or index_path
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+        self._add_crc_column()
+
+    def _add_crc_column(self):
+        """ Upgrade an index built before CRCs were stored; its monthly ZIPs are re-indexed on the next update """
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(members)")]
+        if "crc" not in columns:
+            with self._conn:
+                self._conn.execute("ALTER TABLE members ADD COLUMN crc INTEGER")
+                self._conn.execute("DELETE FROM monthly_zips")
+
+    def close(self):
+        self._conn.close()
+
+    def lookup(self, trade_date, contract):
+        """ Return the member location for one contract on one day, or None """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT outer_path, inner_name, csv_name, header_offset, compress_size, file_size, compress_type, crc "
+                "FROM members WHERE trade_date = ? AND contract = ?",
+                (trade_date.strftime("%Y-%m-%d"), contract)
+            ).fetchone()
+        if row is None:
+            return None
+        keys = ("outer_path", "inner_name", "csv_name", "header_offset", "compress_size", "file_size", "compress_type", "crc")
+        return dict(zip(keys, row))
+
+    def contracts_for_date(self, trade_date):
+        """ All indexed contracts for a trading day """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT contract FROM members WHERE trade_date = ? ORDER BY contract",
+                (trade_date.strftime("%Y-%m-%d"),)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def is_current(self, outer_path):
+        """ True when the monthly ZIP was indexed and has not changed since """
+        stat = os.stat(outer_path)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT size, mtime FROM monthly_zips WHERE outer_path = ?", (outer_path,)
+            ).fetchone()
+        return row is not None and row[0] == stat.st_size and row[1] == stat.st_mtime
+
+    def index_monthly_zip(self, outer_path):
+        """ (Re)index every daily inner ZIP and CSV member of one monthly ZIP """
+        rows = []
+        with zipfile.ZipFile(outer_path, 'r') as outer_zip:
+            for inner_name in outer_zip.namelist():
+                base_name = os.path.basename(inner_name)
+                if not (base_name.startswith("GFDLNFO_TICK_OPTIONS_") and base_name.endswith(".zip")):
+                    continue
+                date_digits = base_name[len("GFDLNFO_TICK_OPTIONS_"):][:8]
+                try:
+                    trade_date = datetime.strptime(date_digits, "%d%m%Y").strftime("%Y-%m-%d")
+                except ValueError:
+                    continue
+
+                with outer_zip.open(inner_name) as inner_zip_file_obj:
+                    with zipfile.ZipFile(inner_zip_file_obj) as inner_zip:
+                        for info in inner_zip.infolist():
+                            if "/Options/" not in info.filename or not info.filename.endswith(".NFO.csv"):
+                                continue
+                            contract = os.path.basename(info.filename)[:-len(".NFO.csv")]
+                            rows.append((
+                                trade_date, contract, outer_path, inner_name, info.filename,
+                                info.header_offset, info.compress_size, info.file_size, info.compress_type,
+                                info.CRC
+                            ))
+
+        stat = os.stat(outer_path)
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM members WHERE outer_path = ?", (outer_path,))
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO members (trade_date, contract, outer_path, inner_name, csv_name, header_offset, "
+                "compress_size, file_size, compress_type, crc) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO monthly_zips VALUES (?, ?, ?)",
+                (outer_path, stat.st_size, stat.st_mtime)
+            )
+        return len(rows)
+
+    def update(self, source_folder, symbol="NIFTY"):
+        """ Index new or changed monthly ZIPs under <source_folder>/<symbol><year>/ """
+        indexed = 0
+        for year_dir in sorted(os.listdir(source_folder)):
+            if not year_dir.startswith(symbol) or not year_dir[len(symbol):].isdigit():
+                continue
+            year_path = os.path.join(source_folder, year_dir)
+            for file_name in sorted(os.listdir(year_path)):
+                if not file_name.upper().endswith(".ZIP"):
+                    continue
+                outer_path = os.path.join(year_path, file_name)
+                if self.is_current(outer_path):
+                    continue
+                logger.info("Indexing %s", outer_path)
+                self.index_monthly_zip(outer_path)
+                indexed += 1
+        return indexed
+
+
+def read_member(inner_zip_file_obj, entry):
+    """
+    Read one CSV member's bytes from an inner ZIP stream using its indexed local-header
+    offset, checked against the indexed CRC-32. Compression methods the fast path does
+    not handle are read through zipfile instead.
+    """
+    if entry["compress_type"] not in (zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED):
+        inner_zip_file_obj.seek(0)
+        with zipfile.ZipFile(inner_zip_file_obj) as inner_zip:
+            return inner_zip.read(entry["csv_name"])
+
+    inner_zip_file_obj.seek(entry["header_offset"])
+    header = inner_zip_file_obj.read(LOCAL_HEADER.size)
+    fields = LOCAL_HEADER.unpack(header)
+    if fields[0] != LOCAL_HEADER_SIGNATURE:
+        raise zipfile.BadZipFile(f"Bad local header for {entry['csv_name']}")
+
+    name_length, extra_length = fields[-2], fields[-1]
+    inner_zip_file_obj.seek(name_length + extra_length, os.SEEK_CUR)
+    data = inner_zip_file_obj.read(entry["compress_size"])
+
+    if entry["compress_type"] == zipfile.ZIP_DEFLATED:
+        data = zlib.decompressobj(-zlib.MAX_WBITS).decompress(data)
+
+    if len(data) != entry["file_size"] or (entry.get("crc") is not None and zlib.crc32(data) != entry["crc"]):
+        raise zipfile.BadZipFile(f"Bad CRC-32 for {entry['csv_name']}")
+    return data
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build or refresh the option archive index")
+    parser.add_argument("--source", default=r"D:\FNODATA", help="Root of the NIFTY<year>/<MON_YYYY>.zip tree")
+    parser.add_argument("--index", default=index_path, help="SQLite index file")
+    parser.add_argument("--symbol", default="NIFTY")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    archive_index = ArchiveIndex(args.index)
+    count = archive_index.update(args.source, args.symbol)
+    logger.info("--- Indexed %d monthly ZIPs ---", count)
+    archive_index.close()
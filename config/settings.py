@@ -19,6 +19,18 @@ class Settings:
     DEVELOPMENT_MODE = os.getenv("DEVELOPMENT_MODE", "true").lower() == "true"
     DEV_USER_ID = int(os.getenv("DEV_USER_ID", "1"))  # Default dev user ID
     
+    # Market data (Zerodha Kite)
+    KITE_API_KEY = os.getenv("KITE_API_KEY", "")
+    KITE_ACCESS_TOKEN = os.getenv("KITE_ACCESS_TOKEN", "")
+    CANDLE_STORE_PATH = os.getenv("CANDLE_STORE_PATH", "data/candles")
+    OPTION_DATA_DIR = os.getenv("OPTION_DATA_DIR", "../Option-Data")
+    OPTION_TICK_STORE_PATH = os.getenv("OPTION_TICK_STORE_PATH", "")  # Parquet tick store, empty = ZIPs only
+    ARCHIVE_INDEX_PATH = os.getenv("ARCHIVE_INDEX_PATH", "")  # ZIP archive index database, empty = off
+    
+    # Backtest jobs
+    BACKTEST_WORKERS = int(os.getenv("BACKTEST_WORKERS", "2"))
+    SWEEP_WORKERS = int(os.getenv("SWEEP_WORKERS", "4"))  # processes per parameter sweep
+    
     # CORS
     ALLOWED_ORIGINS = ["http://localhost:3000", "http://localhost:3001"]
     
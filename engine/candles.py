@@ -0,0 +1,196 @@
+import os
+import threading
+from datetime import date
+from typing import List, Protocol
+
+import pandas as pd
+
+from config.settings import settings
+from engine.market_data import get_kite, load_trading_dates
+
+# Local OHLC candle store.
+#
+# Layout: <root>/<instrument_token>/<timeframe>/<YYYY-MM>.parquet
+#
+# A load only asks the data source for trading dates that are not already in
+# the store, so repeated backtests over the same window never hit the network.
+
+CANDLE_COLUMNS = ['date', 'open', 'high', 'low', 'close', 'volume']
+MAX_DATES_PER_REQUEST = 30
+
+
+class CandleSource(Protocol):
+    def historical_data(self, token, from_date: str, to_date: str, interval: str) -> pd.DataFrame:
+        ...
+
+
+class KiteCandleSource:
+    """Candles from Zerodha Kite historical_data"""
+
+    def historical_data(self, token, from_date, to_date, interval):
+        return pd.DataFrame(get_kite().historical_data(token, from_date, to_date, interval))
+
+
+class LocalFileCandleSource:
+    """Candles from <root>/<token>/<interval>.csv (or .parquet); a stand-in for Kite in tests and offline runs"""
+
+    def __init__(self, root):
+        self.root = root
+        self._frames = {}
+
+    def _frame(self, token, interval):
+        key = (str(token), interval)
+        if key not in self._frames:
+            base = os.path.join(self.root, str(token), interval)
+            if os.path.exists(base + '.parquet'):
+                df = pd.read_parquet(base + '.parquet')
+            else:
+                df = pd.read_csv(base + '.csv')
+            df['date'] = pd.to_datetime(df['date'])
+            self._frames[key] = df.sort_values('date').reset_index(drop=True)
+        return self._frames[key]
+
+    def historical_data(self, token, from_date, to_date, interval):
+        df = self._frame(token, interval)
+        days = df['date'].dt.strftime('%Y-%m-%d')
+        return df[(days >= from_date) & (days <= to_date)].reset_index(drop=True)
+
+
+class CandleStore:
+    """Parquet candle store partitioned by instrument / timeframe / month, synced from a CandleSource"""
+
+    def __init__(self, root, source: CandleSource = None, trading_dates_csv='files/trading_dates.csv'):
+        self.root = root
+        self.source = source or KiteCandleSource()
+        self.trading_dates_csv = trading_dates_csv
+        self._locks = {}  # (token, timeframe) -> lock held while that series is synced
+        self._locks_lock = threading.Lock()
+
+    def _sync_lock(self, token, timeframe):
+        """One lock per series, so a slow fetch of one instrument never blocks another"""
+        with self._locks_lock:
+            return self._locks.setdefault((str(token), timeframe), threading.Lock())
+
+    def partition_path(self, token, timeframe, month):
+        return os.path.join(self.root, str(token), timeframe, f"{month}.parquet")
+
+    def read_partition(self, token, timeframe, month) -> pd.DataFrame:
+        path = self.partition_path(token, timeframe, month)
+        if not os.path.exists(path):
+            return pd.DataFrame(columns=CANDLE_COLUMNS)
+        return pd.read_parquet(path)
+
+    def write_partition(self, token, timeframe, month, df):
+        path = self.partition_path(token, timeframe, month)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + '.tmp'
+        df.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, path)
+
+    def data_version(self, token, start_date, end_date, timeframe) -> str:
+        """Stamp of the stored partitions covering the window; changes whenever one is rewritten"""
+        parts = []
+        for month in pd.period_range(start_date, end_date, freq='M').strftime('%Y-%m'):
+            path = self.partition_path(token, timeframe, month)
+            if os.path.exists(path):
+                stat = os.stat(path)
+                parts.append(f"{month}:{stat.st_mtime_ns}:{stat.st_size}")
+            else:
+                parts.append(f"{month}:-")
+        return ",".join(parts)
+
+    def missing_dates(self, token, timeframe, trading_dates: List[str]) -> List[str]:
+        """Trading dates in the list that have no candles stored yet"""
+        missing = []
+        for month, month_dates in _group_by_month(trading_dates):
+            stored = self.read_partition(token, timeframe, month)
+            covered = set(stored['date'].dt.strftime('%Y-%m-%d')) if not stored.empty else set()
+            missing.extend(d for d in month_dates if d not in covered)
+        return missing
+
+    def sync(self, token, start_date, end_date, timeframe):
+        """
+        Fetch only the trading dates missing from the store and merge them in; returns today's
+        unpersisted candles. Concurrent syncs of the same series wait for each other, so the
+        second one finds the dates already stored instead of fetching them again.
+        """
+        trading_dates = load_trading_dates(start_date, end_date, self.trading_dates_csv)
+        with self._sync_lock(token, timeframe):
+            missing = self.missing_dates(token, timeframe, trading_dates)
+            if not missing:
+                return pd.DataFrame(columns=CANDLE_COLUMNS)
+
+            chunks = _missing_chunks(trading_dates, set(missing))
+            frames = [self.source.historical_data(token, chunk[0], chunk[-1], timeframe) for chunk in chunks]
+            frames = [frame for frame in frames if not frame.empty]
+            if not frames:
+                return pd.DataFrame(columns=CANDLE_COLUMNS)
+
+            fetched = pd.concat(frames, ignore_index=True)
+            fetched['date'] = pd.to_datetime(fetched['date'])
+
+            # Today's session is still forming, so it is never persisted as complete
+            today = date.today().strftime('%Y-%m-%d')
+            days = fetched['date'].dt.strftime('%Y-%m-%d')
+            live = fetched[days >= today]
+            fetched = fetched[days < today]
+
+            months = fetched['date'].dt.strftime('%Y-%m')
+            for month, month_df in fetched.groupby(months):
+                stored = self.read_partition(token, timeframe, month)
+                merged = pd.concat([stored, month_df], ignore_index=True) if not stored.empty else month_df
+                merged = merged.drop_duplicates('date', keep='last').sort_values('date').reset_index(drop=True)
+                self.write_partition(token, timeframe, month, merged)
+            return live
+
+    def load(self, token, start_date, end_date, timeframe) -> pd.DataFrame:
+        """Candles for the window, syncing any missing trading dates first"""
+        live = self.sync(token, start_date, end_date, timeframe)
+
+        months = pd.period_range(start_date, end_date, freq='M').strftime('%Y-%m')
+        frames = [self.read_partition(token, timeframe, month) for month in months] + [live]
+        frames = [frame for frame in frames if not frame.empty]
+        if not frames:
+            return pd.DataFrame(columns=CANDLE_COLUMNS)
+
+        df = pd.concat(frames, ignore_index=True)
+        df = df[_day_mask(df['date'], start_date, end_date)]
+        return df.sort_values('date').reset_index(drop=True)
+
+
+def _group_by_month(trading_dates):
+    months = {}
+    for day in trading_dates:
+        months.setdefault(day[:7], []).append(day)
+    return months.items()
+
+
+def _missing_chunks(trading_dates, missing):
+    """Contiguous runs of missing trading dates, split into requests of at most MAX_DATES_PER_REQUEST dates"""
+    chunks, run = [], []
+    for day in trading_dates:
+        if day in missing and len(run) < MAX_DATES_PER_REQUEST:
+            run.append(day)
+            continue
+        if run:
+            chunks.append(run)
+        run = [day] if day in missing else []
+    if run:
+        chunks.append(run)
+    return chunks
+
+
+def _day_mask(dates, start_date, end_date):
+    """Rows whose wall-clock date falls within [start_date, end_date]"""
+    wall = dates.dt.tz_localize(None) if dates.dt.tz is not None else dates
+    return (wall >= pd.Timestamp(start_date)) & (wall < pd.Timestamp(end_date) + pd.Timedelta(days=1))
+
+
+_stores = {}
+
+
+def get_candle_store(trading_dates_csv='files/trading_dates.csv'):
+    """Process-wide candle store rooted at settings.CANDLE_STORE_PATH, backed by Kite"""
+    if trading_dates_csv not in _stores:
+        _stores[trading_dates_csv] = CandleStore(settings.CANDLE_STORE_PATH, trading_dates_csv=trading_dates_csv)
+    return _stores[trading_dates_csv]
@@ -0,0 +1,151 @@
+import os
+import time
+import hashlib
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from config.settings import settings
+
+# In-memory index of what data exists: option day folders under
+# <option_data_dir>/<YYYY>/<MON>/GFDLNFO_TICK_OPTIONS_<ddmmyyyy>/, trading dates and
+# expiry dates. Everything is rebuilt only when an mtime changes.
+
+DAY_FOLDER_PREFIX = "GFDLNFO_TICK_OPTIONS_"
+
+_date_columns = {}
+_date_columns_lock = threading.Lock()
+
+
+def read_date_column(csv_path, column) -> np.ndarray:
+    """Sorted 'YYYY-MM-DD' strings of one CSV column, re-read only when the file changes"""
+    mtime = os.stat(csv_path).st_mtime_ns
+    key = (str(csv_path), column)
+    cached = _date_columns.get(key)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+
+    with _date_columns_lock:
+        values = pd.to_datetime(pd.read_csv(csv_path)[column]).dt.strftime('%Y-%m-%d').to_numpy(dtype=str)
+        values = np.unique(values)  # sorted, and duplicates dropped
+        _date_columns[key] = (mtime, values)
+    return values
+
+
+def dates_between(values: np.ndarray, start_date, end_date) -> List[str]:
+    """Dates of a sorted 'YYYY-MM-DD' array within [start_date, end_date]"""
+    start = pd.Timestamp(start_date).strftime('%Y-%m-%d')
+    end = pd.Timestamp(end_date).strftime('%Y-%m-%d')
+    lo = np.searchsorted(values, start, side='left')
+    hi = np.searchsorted(values, end, side='right')
+    return values[lo:hi].tolist()
+
+
+class DataCatalog:
+    """Option data availability plus trading-day and expiry lookups, served from memory"""
+
+    def __init__(self, option_data_dir, trading_dates_csv='files/trading_dates.csv',
+                 expiry_dates_csv='files/expiry_dates.csv', check_interval=1.0):
+        self.option_data_dir = Path(option_data_dir)
+        self.trading_dates_csv = trading_dates_csv
+        self.expiry_dates_csv = expiry_dates_csv
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._stamp = None
+        self._checked_at = 0.0
+        self._dates_by_year: Dict[str, List[str]] = {}
+        self._option_dates = np.array([], dtype=str)
+        self._etag = None
+
+    def _directory_stamp(self):
+        """mtimes of the root, year and month folders; adding a day folder changes its month's mtime"""
+        if not self.option_data_dir.is_dir():
+            return None
+        stamp = [(str(self.option_data_dir), os.stat(self.option_data_dir).st_mtime_ns)]
+        for year in os.scandir(self.option_data_dir):
+            if year.is_dir():
+                stamp.append((year.path, year.stat().st_mtime_ns))
+                stamp.extend((month.path, month.stat().st_mtime_ns)
+                             for month in os.scandir(year.path) if month.is_dir())
+        return tuple(sorted(stamp))
+
+    def _scan(self):
+        dates_by_year = {}
+        for year in sorted(os.listdir(self.option_data_dir)):
+            year_path = self.option_data_dir / year
+            if not year_path.is_dir():
+                continue
+
+            dates = []
+            for month in os.listdir(year_path):
+                month_path = year_path / month
+                if not month_path.is_dir():
+                    continue
+                for date_folder in os.listdir(month_path):
+                    # GFDLNFO_TICK_OPTIONS_01082023 -> 2023-08-01
+                    digits = date_folder[len(DAY_FOLDER_PREFIX):][:8]
+                    if date_folder.startswith(DAY_FOLDER_PREFIX) and len(digits) == 8 and digits.isdigit():
+                        dates.append(f"{digits[4:]}-{digits[2:4]}-{digits[:2]}")
+            dates_by_year[year] = sorted(set(dates))
+        return dates_by_year
+
+    def refresh(self, force=False):
+        """Rescan the option data tree if a folder mtime changed (checked at most every check_interval seconds)"""
+        now = time.monotonic()
+        if not force and self._etag is not None and now - self._checked_at < self.check_interval:
+            return
+        with self._lock:
+            stamp = self._directory_stamp()
+            self._checked_at = now
+            if not force and self._etag is not None and stamp == self._stamp:
+                return
+            dates_by_year = self._scan() if stamp is not None else {}
+            all_dates = sorted(date for dates in dates_by_year.values() for date in dates)
+            self._dates_by_year = dates_by_year
+            self._option_dates = np.array(all_dates, dtype=str)
+            self._etag = hashlib.sha1(repr(sorted(dates_by_year.items())).encode()).hexdigest()
+            self._stamp = stamp
+
+    def available_dates(self) -> Tuple[Dict[str, List[str]], str]:
+        """(year -> sorted dates, ETag of that index)"""
+        self.refresh()
+        return self._dates_by_year, self._etag
+
+    def has_option_data(self, date) -> bool:
+        self.refresh()
+        day = pd.Timestamp(date).strftime('%Y-%m-%d')
+        index = np.searchsorted(self._option_dates, day)
+        return index < len(self._option_dates) and self._option_dates[index] == day
+
+    def option_dates(self, start_date, end_date) -> List[str]:
+        self.refresh()
+        return dates_between(self._option_dates, start_date, end_date)
+
+    def trading_dates(self, start_date, end_date) -> List[str]:
+        return dates_between(read_date_column(self.trading_dates_csv, 'date'), start_date, end_date)
+
+    def expiry_dates(self, start_date, end_date) -> List[str]:
+        return dates_between(read_date_column(self.expiry_dates_csv, 'expiry_date'), start_date, end_date)
+
+    def next_expiry(self, date) -> Optional[str]:
+        """First expiry on or after date"""
+        values = read_date_column(self.expiry_dates_csv, 'expiry_date')
+        index = np.searchsorted(values, pd.Timestamp(date).strftime('%Y-%m-%d'), side='left')
+        return values[index] if index < len(values) else None
+
+    def coverage(self, start_date, end_date) -> Dict:
+        """Trading days in the window and which of them have no option data folder"""
+        trading = self.trading_dates(start_date, end_date)
+        available = set(self.option_dates(start_date, end_date))
+        missing = [day for day in trading if day not in available]
+        return {
+            'trading_days': len(trading),
+            'available_days': len(trading) - len(missing),
+            'missing_dates': missing
+        }
+
+
+data_catalog = DataCatalog(settings.OPTION_DATA_DIR)
@@ -0,0 +1,85 @@
+from typing import Any, Dict, Optional
+
+from engine.filters import compile_filters
+from engine.multileg import LegBook, no_reentry_cutoff
+from engine.resample import timeframe_minutes
+
+# Strategy config keys and their defaults; anything else passed in is ignored
+DEFAULT_CONFIG = {
+    'ema9': 9,
+    'ema5': 5,
+    'ema13': 13,
+    'ema21': 21,
+    'ema34': 34,
+    'sma40': 40,
+    'ema40': 40,
+    'sma45': 45,
+    'sma50': 50,
+    'sma100': 100,
+    'sma200': 200,
+    'sma300': 300,
+    'rsi14': 14,
+    'rsi_threshold': 50,
+    'body_ratio': 0.6,
+    'sell_otm': 0,
+    'spread': 200,
+    'lot_size': 50,
+    'max_profit_per_lot': 100,
+    'spot_sl_pct': 0.003,
+    'max_hold': 210,
+    'min_premium': 30,
+    'total_stop_loss': 0,  # Spread PnL stop in rupees, 0 = off
+    'trailing_sl': 0,  # Give-back from peak spread PnL in rupees, 0 = off
+    'instrument_token': 256265,  # NIFTY token
+    'timeframe': '15minute',
+    'filters': [],  # StrategyConfig.filters as dicts; empty = built-in bull credit rule
+    'legs': [],  # StrategyConfig.legs as dicts; empty = built-in bull put spread
+    'legwise_exit': False,
+    'legwise_squareoff': None,  # 'all' closes every leg on the first legwise exit
+    'overlap_entry_allowed': False,
+    'no_reentry_after': None,  # 'HH:MM'
+    'total_target': 0  # Multi-leg PnL target in rupees, 0 = off
+}
+
+INT_FIELDS = ['ema9', 'ema5', 'ema13', 'ema21', 'ema34', 'sma40', 'ema40',
+              'sma45', 'sma50', 'sma100', 'sma200', 'sma300', 'rsi14', 'lot_size',
+              'max_profit_per_lot', 'max_hold', 'spread', 'sell_otm', 'min_premium']
+FLOAT_FIELDS = ['rsi_threshold', 'body_ratio', 'spot_sl_pct', 'total_stop_loss', 'trailing_sl', 'total_target']
+BOOL_FIELDS = ['legwise_exit', 'overlap_entry_allowed']
+
+
+def validate_config(config: Dict[str, Any], defaults: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Validate and merge config with defaults (DEFAULT_CONFIG unless given)"""
+    validated_config = dict(DEFAULT_CONFIG if defaults is None else defaults)
+
+    for key, value in config.items():
+        if key not in validated_config:
+            continue
+        if key in INT_FIELDS:
+            validated_config[key] = int(value) if isinstance(value, (int, float)) else validated_config[key]
+        elif key in FLOAT_FIELDS:
+            validated_config[key] = float(value) if isinstance(value, (int, float)) else validated_config[key]
+        elif key == 'timeframe':
+            # Any timeframe that can be resampled from 1-minute candles, including
+            # the integer minutes used by StrategyConfig.timeFrame
+            try:
+                minutes = timeframe_minutes(value)
+                validated_config[key] = 'day' if minutes is None else ('minute' if minutes == 1 else f"{minutes}minute")
+            except ValueError:
+                pass
+        elif key == 'filters':
+            # Compiling rejects unknown indicators and signs before any data is loaded
+            validated_config[key] = [dict(condition) for condition in value or []]
+            compile_filters(validated_config[key])
+        elif key in BOOL_FIELDS:
+            validated_config[key] = bool(value)
+        elif key == 'legs':
+            validated_config[key] = [dict(leg) for leg in value or []]
+        else:
+            validated_config[key] = value
+
+    # Parsing rejects unknown positions, strikes and expiries before any data is loaded
+    if validated_config['legs']:
+        LegBook(validated_config['legs'], validated_config['lot_size'])
+    no_reentry_cutoff(validated_config)
+    return validated_config
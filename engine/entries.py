@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+
+ENTRY_COLUMNS = ['signal_time', 'execution_time', 'execution_open']
+
+
+def infer_bar_duration(dates: pd.Series) -> pd.Timedelta:
+    """Most common spacing between consecutive bars (ignores overnight gaps)"""
+    diffs = dates.diff().dropna()
+    if diffs.empty:
+        return pd.Timedelta(0)
+    return diffs.mode().iloc[0]
+
+
+def match_signals_with_1min(df_signals, df_1min=None, execution='next_bar', bar_duration=None):
+    """
+    Vectorized entry extraction for `long_signal` bars.
+
+    execution='next_bar'    -> enter at the open of the next signal-timeframe bar
+                               (same result as the old loop over df_signals.loc[idx+1])
+    execution='next_minute' -> enter at the open of the first 1-minute bar at or after
+                               the signal bar's close, i.e. signal_time + bar_duration
+
+    A signal on the final bar has no next bar and is dropped instead of raising KeyError.
+    """
+    if df_signals.empty:
+        return pd.DataFrame(columns=ENTRY_COLUMNS)
+
+    signal_mask = df_signals['long_signal'].to_numpy(dtype=bool)
+
+    if execution == 'next_bar':
+        positions = np.flatnonzero(signal_mask[:-1])
+        return pd.DataFrame({
+            'signal_time': df_signals['date'].iloc[positions].reset_index(drop=True),
+            'execution_time': df_signals['date'].iloc[positions + 1].reset_index(drop=True),
+            'execution_open': df_signals['open'].to_numpy()[positions + 1],
+        })
+
+    if execution == 'next_minute':
+        if df_1min is None:
+            raise ValueError("df_1min is required for execution='next_minute'")
+        if bar_duration is None:
+            bar_duration = infer_bar_duration(df_signals['date'])
+
+        signal_times = df_signals['date'][signal_mask].reset_index(drop=True)
+        minute_dates = pd.DatetimeIndex(df_1min['date'])
+        bar_close = pd.DatetimeIndex(signal_times + pd.Timedelta(bar_duration))
+
+        # Binary search for the first 1-minute bar at or after each signal bar's close
+        positions = minute_dates.searchsorted(bar_close, side='left')
+        valid = positions < len(minute_dates)
+        positions = positions[valid]
+        return pd.DataFrame({
+            'signal_time': signal_times[valid].reset_index(drop=True),
+            'execution_time': df_1min['date'].iloc[positions].reset_index(drop=True),
+            'execution_open': df_1min['open'].to_numpy()[positions],
+        })
+
+    raise ValueError(f"Unknown execution mode: {execution}")
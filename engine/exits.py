@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+from utils.ticks import SECONDS_COLUMN, time_to_seconds
+
+# Exit reasons, in the order they are checked on each candle
+TARGET_HIT = 'target_hit'
+STOP_LOSS = 'stop_loss'
+TIME_EXIT = 'time_exit'
+
+SESSION_END_SECONDS = 15 * 3600 + 30 * 60  # 15:30
+
+
+def time_of_day_seconds(dates: pd.Series) -> np.ndarray:
+    """Wall-clock seconds since midnight for a datetime Series (tz-aware or naive)"""
+    return (dates.dt.hour * 3600 + dates.dt.minute * 60 + dates.dt.second).to_numpy(dtype=np.int64)
+
+
+def tick_seconds(tick_df: pd.DataFrame) -> np.ndarray:
+    """Seconds since midnight of each tick; uses the column pre-parsed by the loader when present"""
+    if SECONDS_COLUMN in tick_df.columns:
+        return tick_df[SECONDS_COLUMN].to_numpy()
+    return time_to_seconds(tick_df['time'])
+
+
+def align_ltp(tick_secs: np.ndarray, tick_ltp: np.ndarray, grid_secs: np.ndarray):
+    """
+    LTP of the first tick at or after each grid time.
+
+    Equivalent to `ticks[ticks['time'] >= t].head(1)` for every t in the grid,
+    done with one binary search. Returns (ltp, valid) where valid marks grid
+    points that had a tick.
+    """
+    positions = np.searchsorted(tick_secs, grid_secs, side='left')
+    valid = positions < len(tick_secs)
+    ltp = np.full(len(grid_secs), np.nan)
+    ltp[valid] = tick_ltp[positions[valid]]
+    return ltp, valid
+
+
+def last_valid_index(valid: np.ndarray) -> np.ndarray:
+    """For each position, index of the most recent True at or before it (-1 when none yet)"""
+    indices = np.where(valid, np.arange(len(valid)), -1)
+    return np.maximum.accumulate(indices) if len(indices) else indices
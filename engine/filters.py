@@ -0,0 +1,182 @@
+import re
+import json
+import hashlib
+from typing import Any, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from utils.cache import LRUCache
+
+# Compiler for StrategyConfig.filters. Each FilterCondition compares two operands,
+# "<indicatorA> <valueA>" <sign> "<indicatorB> <valueB>":
+#
+#   EMA / SMA / RSI        length from the name ("EMA(21)") or else from the value
+#   Price / Close / Open / High / Low
+#                          candle column; the value is ignored
+#   Body / Range           close - open / high - low, times the value (default 1)
+#   Value / Number / Constant
+#                          the value itself
+#
+# All conditions must hold (AND). A compiled plan lists every distinct operand and
+# every distinct comparison once, so shared subexpressions are evaluated once.
+
+INDICATOR_KINDS = {'ema': 'ema', 'sma': 'sma', 'rsi': 'rsi'}
+PRICE_COLUMNS = {'price': 'close', 'close': 'close', 'ltp': 'close', 'open': 'open', 'high': 'high', 'low': 'low'}
+CONSTANT_NAMES = ('value', 'number', 'constant')
+
+COMPARATORS = {
+    'greater than': '>', '>': '>',
+    'less than': '<', '<': '<',
+    'greater than or equal': '>=', 'greater than or equal to': '>=', '>=': '>=',
+    'less than or equal': '<=', 'less than or equal to': '<=', '<=': '<=',
+    'equal': '==', 'equal to': '==', 'equals': '==', '==': '==', '=': '==',
+    'crosses above': 'crosses_above', 'crosses below': 'crosses_below',
+}
+
+_OPERAND_PATTERN = re.compile(r'^\s*([A-Za-z_ ]+?)\s*(?:\(\s*([-+]?[\d.]+)\s*\))?\s*$')
+
+
+def _number(value, what):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{what} needs a numeric value, got {value!r}")
+
+
+def parse_operand(indicator: str, value: Any) -> Tuple:
+    """Operand key, e.g. ('ema', 21), ('price', 'close'), ('range', 0.6) or ('const', 55.0)"""
+    match = _OPERAND_PATTERN.match(str(indicator or ''))
+    if not match:
+        raise ValueError(f"Unknown indicator: {indicator!r}")
+    name, inline = match.group(1).strip().lower(), match.group(2)
+
+    if name in INDICATOR_KINDS:
+        length = _number(inline if inline is not None else value, f"{indicator} length")
+        if length < 1 or length != int(length):
+            raise ValueError(f"{indicator} length must be a positive integer")
+        return (INDICATOR_KINDS[name], int(length))
+    if name in PRICE_COLUMNS:
+        return ('price', PRICE_COLUMNS[name])
+    if name in ('body', 'range'):
+        factor = 1.0 if value in (None, '') else _number(value, indicator)
+        return (name, factor)
+    if name in CONSTANT_NAMES:
+        return ('const', _number(value, indicator))
+    raise ValueError(f"Unknown indicator: {indicator!r}")
+
+
+def _condition_fields(condition) -> Dict[str, Any]:
+    """FilterCondition model or plain dict -> dict"""
+    return condition if isinstance(condition, dict) else condition.dict()
+
+
+class FilterPlan:
+    """
+    A compiled filter list: distinct operands (`operands`, evaluated in order) and
+    distinct comparisons as (operator, left operand index, right operand index).
+    """
+
+    def __init__(self, operands: List[Tuple], comparisons: List[Tuple[str, int, int]]):
+        self.operands = operands
+        self.comparisons = comparisons
+
+    @property
+    def indicators(self) -> List[Tuple[str, int]]:
+        """(kind, length) of every indicator series the plan reads"""
+        return [operand for operand in self.operands if operand[0] in INDICATOR_KINDS.values()]
+
+    def _operand_values(self, df, operand, engine, instrument, timeframe, data_version) -> np.ndarray:
+        kind, param = operand
+        if kind in INDICATOR_KINDS.values():
+            return engine.get(df, kind, param, instrument, timeframe, data_version)
+        if kind == 'price':
+            return df[param].to_numpy(dtype=np.float64)
+        if kind == 'body':
+            return param * (df['close'] - df['open']).to_numpy(dtype=np.float64)
+        if kind == 'range':
+            return param * (df['high'] - df['low']).to_numpy(dtype=np.float64)
+        return np.full(len(df), param)
+
+    def evaluate(self, df, engine, instrument=None, timeframe=None, data_version=None) -> Tuple[np.ndarray, np.ndarray]:
+        """(signal mask, rows where every indicator the plan reads is warmed up)"""
+        values = [self._operand_values(df, operand, engine, instrument, timeframe, data_version)
+                  for operand in self.operands]
+
+        signal = np.ones(len(df), dtype=bool)
+        for op, left, right in self.comparisons:
+            a, b = values[left], values[right]
+            if op == '>':
+                signal &= a > b
+            elif op == '<':
+                signal &= a < b
+            elif op == '>=':
+                signal &= a >= b
+            elif op == '<=':
+                signal &= a <= b
+            elif op == '==':
+                signal &= a == b
+            else:
+                # Beyond b on this bar and on the other side (not NaN) on the previous one
+                now, before = (a > b, a <= b) if op == 'crosses_above' else (a < b, a >= b)
+                signal &= now & np.concatenate(([False], before[:-1]))
+
+        valid = np.ones(len(df), dtype=bool)
+        for operand, series in zip(self.operands, values):
+            if operand[0] in INDICATOR_KINDS.values():
+                valid &= ~np.isnan(series)
+        return signal, valid
+
+
+def filters_hash(filters: Sequence) -> str:
+    canonical = json.dumps([_condition_fields(condition) for condition in filters],
+                           sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+_plan_cache = LRUCache(max_items=256)
+
+
+def compile_filters(filters: Sequence) -> FilterPlan:
+    """Compile (and cache by content hash) a list of FilterCondition models or dicts"""
+    key = filters_hash(filters)
+    plan = _plan_cache.get(key)
+    if plan is not None:
+        return plan
+
+    operands, operand_index, comparisons = [], {}, []
+    for condition in filters:
+        fields = _condition_fields(condition)
+        sign = str(fields.get('sign') or '').strip().lower()
+        if sign not in COMPARATORS:
+            raise ValueError(f"Unknown comparison: {fields.get('sign')!r}")
+
+        sides = []
+        for indicator, value in ((fields.get('indicatorA'), fields.get('valueA')),
+                                 (fields.get('indicatorB'), fields.get('valueB'))):
+            operand = parse_operand(indicator, value)
+            if operand not in operand_index:
+                operand_index[operand] = len(operands)
+                operands.append(operand)
+            sides.append(operand_index[operand])
+
+        comparison = (COMPARATORS[sign], sides[0], sides[1])
+        if comparison not in comparisons:
+            comparisons.append(comparison)
+
+    plan = FilterPlan(operands, comparisons)
+    _plan_cache.put(key, plan)
+    return plan
+
+
+def bull_credit_filters(config: Dict[str, Any]) -> List[Dict[str, str]]:
+    """The built-in long rule: ema9 > ema21 > sma200, RSI above threshold and a strong bullish body"""
+    return [
+        {'indicatorA': 'EMA', 'valueA': str(config['ema9']), 'sign': 'Greater than',
+         'indicatorB': 'EMA', 'valueB': str(config['ema21'])},
+        {'indicatorA': 'EMA', 'valueA': str(config['ema21']), 'sign': 'Greater than',
+         'indicatorB': 'SMA', 'valueB': str(config['sma200'])},
+        {'indicatorA': 'RSI', 'valueA': str(config['rsi14']), 'sign': 'Greater than',
+         'indicatorB': 'Value', 'valueB': repr(float(config['rsi_threshold']))},
+        {'indicatorA': 'Body', 'valueA': '', 'sign': 'Greater than or equal',
+         'indicatorB': 'Range', 'valueB': repr(float(config['body_ratio']))},
+    ]
@@ -0,0 +1,212 @@
+import numpy as np
+import pandas as pd
+from engine.filters import compile_filters, bull_credit_filters
+from utils.cache import LRUCache
+
+# Indicator columns used by the bull credit rules -> (kind, config key holding the length).
+# Column names stay fixed even when a template overrides the length (e.g. ema9: 5).
+SIGNAL_INDICATORS = {
+    'ema_5': ('ema', 'ema5'),
+    'ema_9': ('ema', 'ema9'),
+    'ema_13': ('ema', 'ema13'),
+    'ema_21': ('ema', 'ema21'),
+    'ema_34': ('ema', 'ema34'),
+    'sma_40': ('sma', 'sma40'),
+    'ema_40': ('ema', 'ema40'),
+    'sma_45': ('sma', 'sma45'),
+    'sma_50': ('sma', 'sma50'),
+    'sma_100': ('sma', 'sma100'),
+    'sma_200': ('sma', 'sma200'),
+    'sma_300': ('sma', 'sma300'),
+    'rsi_14': ('rsi', 'rsi14'),
+}
+
+
+def _ewm_alpha(com):
+    """Smoothing factor exactly as pandas derives it from com/span/alpha"""
+    return 1.0 / (1.0 + com)
+
+
+def _ewm_step(weighted, old_wt, value, alpha, adjust):
+    """One step of pandas' exponentially weighted mean recursion (same arithmetic, same rounding)"""
+    if np.isnan(weighted):
+        return value, old_wt
+    new_wt = 1.0 if adjust else alpha
+    old_wt *= 1.0 - alpha
+    if weighted != value:
+        weighted = (old_wt * weighted + new_wt * value) / (old_wt + new_wt)
+    return weighted, (old_wt + new_wt) if adjust else 1.0
+
+
+def _ewm_old_wt(nobs, alpha):
+    """Accumulated weight of an adjusted EWM after nobs observations (stops once it converges)"""
+    old_wt = 1.0
+    for _ in range(nobs - 1):
+        next_wt = old_wt * (1.0 - alpha) + 1.0
+        if next_wt == old_wt:
+            break
+        old_wt = next_wt
+    return old_wt
+
+
+class IndicatorSeries:
+    """Computed values of one indicator plus the state needed to extend it with new bars"""
+
+    def __init__(self, kind, length):
+        self.kind = kind
+        self.length = length
+        self.values = np.empty(0)
+        self.state = {}
+
+    def compute(self, close: np.ndarray):
+        """Full computation, numerically matching pandas_ta's ema/sma/rsi"""
+        series = pd.Series(close)
+        length = self.length
+
+        if self.kind == 'sma':
+            self.values = series.rolling(length, min_periods=length).mean().to_numpy()
+            self.state = {'tail': close[-(length - 1):] if length > 1 else close[:0]}
+
+        elif self.kind == 'ema':
+            # pandas_ta seeds the EMA with the SMA of the first `length` closes
+            seeded = series.copy()
+            if len(seeded) >= length:
+                seeded.iloc[length - 1] = series.iloc[0:length].mean()
+            seeded.iloc[:length - 1] = np.nan
+            self.values = seeded.ewm(span=length, adjust=False).mean().to_numpy()
+            last = self.values[-1] if len(self.values) else np.nan
+            self.state = {'weighted': last, 'old_wt': 1.0}
+
+        elif self.kind == 'rsi':
+            diff = series.diff()
+            positive = diff.clip(lower=0)
+            negative = diff.clip(upper=0)
+            positive_avg = positive.ewm(alpha=1.0 / length, min_periods=length).mean()
+            negative_avg = negative.ewm(alpha=1.0 / length, min_periods=length).mean()
+            self.values = (100 * positive_avg / (positive_avg + negative_avg.abs())).to_numpy()
+
+            nobs = max(len(close) - 1, 0)
+            old_wt = _ewm_old_wt(nobs, _ewm_alpha(length - 1.0))
+            self.state = {
+                'pos': (positive.ewm(alpha=1.0 / length).mean().iloc[-1] if nobs else np.nan, old_wt),
+                'neg': (negative.ewm(alpha=1.0 / length).mean().iloc[-1] if nobs else np.nan, old_wt),
+                'last_close': close[-1] if len(close) else np.nan,
+                'nobs': nobs
+            }
+
+        else:
+            raise ValueError(f"Unknown indicator kind: {self.kind}")
+
+    def append(self, new_close: np.ndarray):
+        """Extend the series with bars appended after the ones already computed"""
+        length = self.length
+        if self.kind == 'sma':
+            window = np.concatenate([self.state['tail'], new_close])
+            rolled = pd.Series(window).rolling(length, min_periods=length).mean().to_numpy()
+            new_values = rolled[len(self.state['tail']):]
+            self.state['tail'] = window[-(length - 1):] if length > 1 else window[:0]
+
+        elif self.kind == 'ema':
+            alpha = _ewm_alpha((length - 1) / 2.0)
+            weighted, old_wt = self.state['weighted'], self.state['old_wt']
+            new_values = np.empty(len(new_close))
+            for i, value in enumerate(new_close):
+                weighted, old_wt = _ewm_step(weighted, old_wt, value, alpha, False)
+                new_values[i] = weighted
+            self.state = {'weighted': weighted, 'old_wt': old_wt}
+
+        else:
+            alpha = _ewm_alpha(length - 1.0)
+            pos, neg = self.state['pos'], self.state['neg']
+            last_close, nobs = self.state['last_close'], self.state['nobs']
+            new_values = np.empty(len(new_close))
+            for i, value in enumerate(new_close):
+                change = value - last_close
+                pos = _ewm_step(pos[0], pos[1], max(change, 0.0), alpha, True)
+                neg = _ewm_step(neg[0], neg[1], min(change, 0.0), alpha, True)
+                nobs += 1
+                new_values[i] = 100 * pos[0] / (pos[0] + abs(neg[0])) if nobs >= length else np.nan
+                last_close = value
+            self.state = {'pos': pos, 'neg': neg, 'last_close': last_close, 'nobs': nobs}
+
+        self.values = np.concatenate([self.values, new_values])
+
+    def extended(self, new_close: np.ndarray) -> 'IndicatorSeries':
+        """Copy of the series with new bars appended; self is left untouched for other readers"""
+        series = IndicatorSeries(self.kind, self.length)
+        series.values = self.values
+        series.state = dict(self.state)
+        series.append(new_close)
+        return series
+
+    @property
+    def warm(self):
+        """Incremental append needs a fully seeded state"""
+        return len(self.values) >= self.length
+
+
+class IndicatorEngine:
+    """
+    Computes only the indicators a rule set asks for and caches each series by
+    (instrument, timeframe, kind, length, data_version). When the same series is
+    requested again over a longer frame that extends the cached bars, only the
+    new bars are computed.
+    """
+
+    def __init__(self, max_series=512):
+        self.cache = LRUCache(max_items=max_series)
+
+    def get(self, df, kind, length, instrument=None, timeframe=None, data_version=None) -> np.ndarray:
+        close = df['close'].to_numpy(dtype=np.float64)
+        key = (instrument, timeframe, kind, int(length), data_version)
+        cached = self.cache.get(key) if data_version is not None else None
+
+        if cached is not None:
+            series, first_date, last_date = cached
+            n = len(series.values)
+            dates = df['date']
+            if len(df) >= n and n > 0 and dates.iloc[0] == first_date and dates.iloc[n - 1] == last_date:
+                if len(df) > n and series.warm:
+                    # Cached series may be read by other threads, so extend a copy and swap it in
+                    series = series.extended(close[n:])
+                    self.cache.put(key, (series, dates.iloc[0], dates.iloc[-1]))
+                if len(df) == len(series.values):
+                    return series.values
+
+        series = IndicatorSeries(kind, int(length))
+        series.compute(close)
+        if data_version is not None and len(df):
+            self.cache.put(key, (series, df['date'].iloc[0], df['date'].iloc[-1]))
+        return series.values
+
+    def frame(self, df, columns, config, instrument=None, timeframe=None, data_version=None) -> pd.DataFrame:
+        """Copy of df with the requested SIGNAL_INDICATORS columns added"""
+        out = df.copy()
+        for column in columns:
+            kind, config_key = SIGNAL_INDICATORS[column]
+            out[column] = self.get(df, kind, config[config_key], instrument, timeframe, data_version)
+        return out
+
+
+indicator_engine = IndicatorEngine()
+
+
+def generate_signals(interval_df, config, engine=None, data_version=None):
+    """
+    Long signals of a strategy: every condition of config['filters'] (see engine.filters)
+    must hold. Without filters the built-in bull credit rule is used: ema_9 > ema_21 >
+    sma_200, rsi_14 above threshold and a strong bullish body. Only the indicators the
+    rules reference are computed, and bars before they are warmed up are dropped.
+    """
+    engine = engine or indicator_engine
+    plan = compile_filters(config.get('filters') or bull_credit_filters(config))
+    long_signal, valid = plan.evaluate(
+        interval_df, engine,
+        instrument=config.get('instrument_token'),
+        timeframe=config.get('timeframe'),
+        data_version=data_version
+    )
+
+    df = interval_df.loc[valid, ['date', 'open', 'close']].copy()
+    df['long_signal'] = long_signal[valid]
+    return df
@@ -0,0 +1,193 @@
+import numpy as np
+
+# numba (in requirements.txt) compiles the path loop below. If it cannot be
+# imported the equivalent NumPy implementation is used instead; both produce
+# the same exit index, reason and per-leg exits.
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+NO_EXIT = 0
+TARGET = 1
+TOTAL_STOP = 2
+TRAILING_STOP = 3
+SPOT_STOP = 4
+LEGS_EXITED = 5
+MAX_HOLD = 6
+
+REASON_NAMES = {
+    NO_EXIT: None,
+    TARGET: 'target_hit',
+    TOTAL_STOP: 'total_stop_loss',
+    TRAILING_STOP: 'trailing_stop',
+    SPOT_STOP: 'stop_loss',
+    LEGS_EXITED: 'legs_exited',
+    MAX_HOLD: 'time_exit',
+}
+
+
+def _path_exit_loop(spot_low, leg_pnl, leg_target, leg_stop, legwise,
+                    total_target, total_stop, trailing_sl, spot_sl, max_hold, leg_exit):
+    """
+    Single pass over the candles of one trade.
+
+    Per candle, in order: leg-wise exits (each leg freezes its PnL at its own
+    target/stop), then total target, total stop, trailing stop from the peak
+    total PnL, spot stop on the candle low, all legs closed, and max hold.
+    PnL-based checks only run on candles where every open leg is quoted
+    (leg_pnl is NaN where a leg has no quote).
+    """
+    n, k = leg_pnl.shape
+    frozen = np.zeros(k)
+    peak = -np.inf
+    for j in range(k):
+        leg_exit[j] = -1
+
+    for t in range(n):
+        quoted = True
+        open_legs = 0
+        total = 0.0
+        for j in range(k):
+            if leg_exit[j] >= 0:
+                total += frozen[j]
+                continue
+            value = leg_pnl[t, j]
+            if np.isnan(value):
+                quoted = False
+                open_legs += 1
+                continue
+            if legwise and ((leg_target[j] > 0 and value >= leg_target[j]) or
+                            (leg_stop[j] > 0 and value <= -leg_stop[j])):
+                leg_exit[j] = t
+                frozen[j] = value
+            else:
+                open_legs += 1
+            total += value
+
+        if quoted:
+            if total_target > 0 and total >= total_target:
+                return t, TARGET, total
+            if total_stop > 0 and total <= -total_stop:
+                return t, TOTAL_STOP, total
+            if total > peak:
+                peak = total
+            if trailing_sl > 0 and total <= peak - trailing_sl:
+                return t, TRAILING_STOP, total
+        if spot_sl > 0 and spot_low[t] <= spot_sl:
+            return t, SPOT_STOP, total if quoted else np.nan
+        if k > 0 and open_legs == 0:
+            return t, LEGS_EXITED, total
+        if max_hold > 0 and t + 1 >= max_hold:
+            return t, MAX_HOLD, total if quoted else np.nan
+
+    return -1, NO_EXIT, np.nan
+
+
+_path_exit_compiled = njit(cache=True, nogil=True)(_path_exit_loop) if njit is not None else None
+
+
+def _first(mask):
+    index = int(np.argmax(mask)) if len(mask) else 0
+    return index if len(mask) and mask[index] else -1
+
+
+def _path_exit_numpy(spot_low, leg_pnl, leg_target, leg_stop, legwise,
+                     total_target, total_stop, trailing_sl, spot_sl, max_hold, leg_exit):
+    """Vectorized equivalent of _path_exit_loop"""
+    n, k = leg_pnl.shape
+    effective = leg_pnl.copy()
+
+    for j in range(k):
+        leg_exit[j] = -1
+        if not legwise:
+            continue
+        values = leg_pnl[:, j]
+        hit = np.zeros(n, dtype=bool)
+        if leg_target[j] > 0:
+            hit |= values >= leg_target[j]
+        if leg_stop[j] > 0:
+            hit |= values <= -leg_stop[j]
+        t = _first(hit)
+        if t >= 0:
+            leg_exit[j] = t
+            effective[t + 1:, j] = values[t]
+
+    quoted = ~np.isnan(effective).any(axis=1) if k > 0 else np.ones(n, dtype=bool)
+    total = np.where(quoted, np.nan_to_num(effective).sum(axis=1), np.nan)
+    peak = np.fmax.accumulate(np.where(quoted, total, -np.inf)) if n else total
+
+    open_legs = np.full(n, k)
+    for j in range(k):
+        if leg_exit[j] >= 0:
+            open_legs[leg_exit[j]:] -= 1
+
+    candidates = []
+    if total_target > 0:
+        candidates.append((_first(quoted & (total >= total_target)), TARGET))
+    if total_stop > 0:
+        candidates.append((_first(quoted & (total <= -total_stop)), TOTAL_STOP))
+    if trailing_sl > 0:
+        candidates.append((_first(quoted & (total <= peak - trailing_sl)), TRAILING_STOP))
+    if spot_sl > 0:
+        candidates.append((_first(spot_low <= spot_sl), SPOT_STOP))
+    if k > 0:
+        candidates.append((_first(open_legs == 0), LEGS_EXITED))
+    if max_hold > 0 and max_hold <= n:
+        candidates.append((max_hold - 1, MAX_HOLD))
+
+    # Earliest candle wins; on the same candle the lower reason code was checked first
+    hits = [(t, reason) for t, reason in candidates if t >= 0]
+    if not hits:
+        return -1, NO_EXIT, np.nan
+
+    t, reason = min(hits)
+    # Legs that would only have exited after the trade closed stay open
+    for j in range(k):
+        if leg_exit[j] > t:
+            leg_exit[j] = -1
+    return t, reason, total[t]
+
+
+def _hold_candles(max_hold) -> int:
+    """Kernel max_hold: 0 (no time exit) when unset, otherwise at least one candle"""
+    return 0 if max_hold is None else max(int(max_hold), 1)
+
+
+def evaluate_exit(spot_low, leg_pnl, exit_params, use_compiled=True):
+    """
+    Find the exit of one trade from contiguous float64 arrays.
+
+    spot_low: (n,) candle lows; leg_pnl: (n, k) PnL per leg per candle, NaN
+    where the leg has no quote. exit_params keys (all optional, 0 disables):
+    leg_target, leg_stop (per-leg arrays), legwise, total_target, total_stop,
+    trailing_sl, spot_sl; and max_hold, the candles a trade may hold, where
+    values below 1 exit on the first candle like the original loop and
+    MinuteGrid.window (leave it out for no time exit).
+
+    Returns (exit_index, reason_name, exit_pnl, leg_exit_index) with
+    exit_index -1 when no exit condition is met.
+    """
+    spot_low = np.ascontiguousarray(spot_low, dtype=np.float64)
+    leg_pnl = np.ascontiguousarray(leg_pnl, dtype=np.float64)
+    if leg_pnl.ndim == 1:
+        leg_pnl = leg_pnl.reshape(-1, 1)
+    k = leg_pnl.shape[1]
+
+    leg_target = np.ascontiguousarray(exit_params.get('leg_target', np.zeros(k)), dtype=np.float64)
+    leg_stop = np.ascontiguousarray(exit_params.get('leg_stop', np.zeros(k)), dtype=np.float64)
+    leg_exit = np.full(k, -1, dtype=np.int64)
+    args = (
+        spot_low, leg_pnl, leg_target, leg_stop,
+        bool(exit_params.get('legwise', False)),
+        float(exit_params.get('total_target') or 0),
+        float(exit_params.get('total_stop') or 0),
+        float(exit_params.get('trailing_sl') or 0),
+        float(exit_params.get('spot_sl') or 0),
+        _hold_candles(exit_params.get('max_hold')),
+        leg_exit
+    )
+
+    kernel = _path_exit_compiled if use_compiled and _path_exit_compiled is not None else _path_exit_numpy
+    index, reason, pnl = kernel(*args)
+    return int(index), REASON_NAMES[int(reason)], float(pnl), leg_exit
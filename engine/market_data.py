@@ -0,0 +1,36 @@
+from datetime import date
+
+from config.settings import settings
+from engine.catalog import dates_between, read_date_column
+
+_kite = None
+
+
+def get_kite():
+    """Shared KiteConnect client, created on first use from KITE_API_KEY / KITE_ACCESS_TOKEN"""
+    global _kite
+    if _kite is None:
+        from kiteconnect import KiteConnect
+        _kite = KiteConnect(api_key=settings.KITE_API_KEY, access_token=settings.KITE_ACCESS_TOKEN)
+    return _kite
+
+
+def load_trading_dates(start_date, end_date, trading_dates_csv='files/trading_dates.csv'):
+    """Trading dates (YYYY-MM-DD strings) within the window, ascending"""
+    return dates_between(read_date_column(trading_dates_csv, 'date'), start_date, end_date)
+
+
+def fetch_max_data_zerodha(token, start_date, end_date, time_data,
+                           trading_dates_csv='files/trading_dates.csv'):
+    """Historical candles for the window, served from the local candle store (Kite only for missing dates)"""
+    from engine.candles import get_candle_store
+    return get_candle_store(trading_dates_csv).load(token, start_date, end_date, time_data)
+
+
+def candle_data_version(token, start_date, end_date, time_data,
+                        trading_dates_csv='files/trading_dates.csv'):
+    """Candle store stamp of the window for indicator caching; None while it includes today's forming session"""
+    if end_date >= date.today().strftime('%Y-%m-%d'):
+        return None
+    from engine.candles import get_candle_store
+    return get_candle_store(trading_dates_csv).data_version(token, start_date, end_date, time_data)
@@ -0,0 +1,234 @@
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+# Backtest performance metrics computed on NumPy arrays in a single pass per
+# quantity, without re-filtering the trade frame. Trades are serialized column
+# by column; only the final record dicts are built per row.
+
+TRADING_DAYS_PER_YEAR = 252
+WEEKDAY_NAMES = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+# Trade fields of the API response, by how they are converted
+TIME_FIELDS = ['signal_time', 'entry_time', 'exit_time']
+PRICE_FIELDS = ['entry_price', 'exit_price']
+STRIKE_FIELDS = ['buy_leg_strike', 'sell_leg_strike']
+LEG_PRICE_FIELDS = ['buy_leg_entry_price', 'sell_leg_entry_price', 'buy_leg_exit_price', 'sell_leg_exit_price']
+
+
+def pnl_column(trades_df: pd.DataFrame) -> str:
+    """net_option_pnl when the simulation produced it, otherwise the spot pnl"""
+    return 'net_option_pnl' if 'net_option_pnl' in trades_df.columns else 'pnl'
+
+
+def session_days(values) -> np.ndarray:
+    """Calendar day (datetime64[D], exchange-local) of each timestamp; NaT stays NaT"""
+    index = pd.DatetimeIndex(values)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    return index.to_numpy(dtype='datetime64[D]')
+
+
+def _longest_run(mask: np.ndarray) -> int:
+    """Length of the longest run of True values"""
+    if not mask.any():
+        return 0
+    padded = np.concatenate(([0], mask.astype(np.int8), [0]))
+    edges = np.flatnonzero(np.diff(padded))
+    return int((edges[1::2] - edges[::2]).max())
+
+
+def _ratio(numerator: float, denominator: float) -> float:
+    return float(numerator / denominator) if denominator else 0.0
+
+
+def trade_metrics(pnl: np.ndarray) -> Dict[str, Any]:
+    """Per-trade statistics of a PnL array (NaN already replaced by 0)"""
+    total_trades = len(pnl)
+    wins = pnl > 0
+    losses = pnl < 0
+    winning_trades = int(wins.sum())
+    losing_trades = int(losses.sum())
+    gross_profit = float(pnl[wins].sum())
+    gross_loss = float(pnl[losses].sum())
+
+    cumulative = np.cumsum(pnl)
+    drawdown = cumulative - np.maximum.accumulate(cumulative)
+    std = float(pnl.std(ddof=1)) if total_trades > 1 else 0.0
+    mean = float(pnl.mean())
+
+    return {
+        'total_trades': total_trades,
+        'winning_trades': winning_trades,
+        'losing_trades': losing_trades,
+        'win_rate': round(_ratio(winning_trades * 100, total_trades), 2),
+        'total_pnl': round(float(cumulative[-1]), 2),
+        'max_drawdown': round(abs(float(drawdown.min())), 2),
+        'sharpe_ratio': round(_ratio(mean, std), 3),  # per trade, unannualized
+        'average_profit': round(_ratio(gross_profit, winning_trades), 2),
+        'average_loss': round(_ratio(gross_loss, losing_trades), 2),
+        'max_profit': round(float(pnl.max()), 2),
+        'max_loss': round(float(pnl.min()), 2),
+        'profit_factor': round(abs(_ratio(gross_profit, gross_loss)), 2),
+        'expectancy': round(mean, 2),
+        'max_consecutive_wins': _longest_run(wins),
+        'max_consecutive_losses': _longest_run(losses),
+    }
+
+
+def daily_metrics(days: np.ndarray, pnl: np.ndarray, trading_days: Optional[Sequence] = None) -> Dict[str, Any]:
+    """
+    Risk metrics on the daily equity curve. PnL is booked on the day a trade closes;
+    trading_days (default: weekdays between the first and last trade) adds the flat
+    days in between so they count towards volatility and drawdown duration.
+    """
+    valid = ~np.isnat(days)
+    days, pnl = days[valid], pnl[valid]
+    if not len(days):
+        return {'daily_sharpe': 0.0, 'daily_sortino': 0.0, 'calmar_ratio': 0.0, 'max_drawdown_duration_days': 0}
+
+    if trading_days is None:
+        calendar = np.arange(days.min(), days.max() + np.timedelta64(1, 'D'))
+        calendar = calendar[np.is_busday(calendar)]
+    else:
+        calendar = session_days(trading_days)
+    calendar = np.union1d(calendar, days)  # sorted, and never drops a day that has trades
+
+    daily = np.bincount(np.searchsorted(calendar, days), weights=pnl, minlength=len(calendar))
+    equity = np.cumsum(daily)
+    peak = np.maximum.accumulate(np.maximum(equity, 0.0))  # equity starts at 0
+    max_drawdown = float((peak - equity).max())
+
+    mean = float(daily.mean())
+    std = float(daily.std(ddof=1)) if len(daily) > 1 else 0.0
+    downside = float(np.sqrt(np.mean(np.minimum(daily, 0.0) ** 2)))
+    annual_pnl = mean * TRADING_DAYS_PER_YEAR
+
+    return {
+        'daily_sharpe': round(_ratio(mean, std) * float(np.sqrt(TRADING_DAYS_PER_YEAR)), 3),
+        'daily_sortino': round(_ratio(mean, downside) * float(np.sqrt(TRADING_DAYS_PER_YEAR)), 3),
+        'calmar_ratio': round(_ratio(annual_pnl, max_drawdown), 3),  # annualized PnL / max daily drawdown
+        'max_drawdown_duration_days': _longest_run(equity < peak),  # trading days below a prior peak
+    }
+
+
+def _breakdown(codes: np.ndarray, labels: List[str], key: str, pnl: np.ndarray) -> List[Dict[str, Any]]:
+    """Trades, PnL and win rate per group code (codes index into labels)"""
+    count = np.bincount(codes, minlength=len(labels))
+    total = np.bincount(codes, weights=pnl, minlength=len(labels))
+    wins = np.bincount(codes, weights=(pnl > 0).astype(float), minlength=len(labels))
+    return [
+        {key: label, 'trades': int(count[i]), 'pnl': round(float(total[i]), 2),
+         'win_rate': round(_ratio(wins[i] * 100, count[i]), 2)}
+        for i, label in enumerate(labels) if count[i]
+    ]
+
+
+def period_breakdowns(days: np.ndarray, pnl: np.ndarray) -> Dict[str, List[Dict[str, Any]]]:
+    """Results grouped by calendar month and by weekday of entry"""
+    valid = ~np.isnat(days)
+    days, pnl = days[valid], pnl[valid]
+
+    months = days.astype('datetime64[M]')
+    unique_months, month_codes = np.unique(months, return_inverse=True)
+    weekdays = (days.astype(np.int64) + 3) % 7  # 1970-01-01 was a Thursday; 0 = Monday
+
+    return {
+        'monthly_breakdown': _breakdown(month_codes, [str(month) for month in unique_months], 'month', pnl),
+        'weekday_breakdown': _breakdown(weekdays, WEEKDAY_NAMES, 'weekday', pnl),
+    }
+
+
+def _iso_strings(values) -> List[Optional[str]]:
+    """Timestamp.isoformat() of a column without a per-row loop; NaT -> None"""
+    index = pd.DatetimeIndex(pd.to_datetime(values, errors='coerce'))
+    wall = index.tz_localize(None) if index.tz is not None else index
+    text = np.datetime_as_string(wall.to_numpy().astype('datetime64[s]'), unit='s')
+    fractional = wall.microsecond != 0
+    if fractional.any():
+        micros = np.datetime_as_string(wall.to_numpy().astype('datetime64[us]'), unit='us')
+        text = np.where(fractional, micros, text)
+    if index.tz is not None:
+        # UTC offset of each timestamp, e.g. '+05:30'
+        utc = index.tz_convert('UTC').tz_localize(None)
+        minutes = (wall.to_numpy() - utc.to_numpy()).astype('timedelta64[m]').astype(np.int64)
+        minutes[index.isna()] = 0
+        offsets, inverse = np.unique(minutes, return_inverse=True)
+        labels = np.array([f"{'-' if m < 0 else '+'}{abs(m) // 60:02d}:{abs(m) % 60:02d}" for m in offsets.tolist()])
+        text = np.char.add(text, labels[inverse])
+    text = text.tolist()
+    if index.hasnans:
+        text = np.where(index.isna(), None, np.array(text, dtype=object)).tolist()
+    return text
+
+
+def _numbers(trades_df: pd.DataFrame, column: str) -> pd.Series:
+    if column not in trades_df.columns:
+        return pd.Series(0.0, index=trades_df.index)
+    return pd.to_numeric(trades_df[column], errors='coerce').fillna(0.0).astype(float)
+
+
+def serialize_trades(trades_df: pd.DataFrame, pnl: np.ndarray) -> List[Dict[str, Any]]:
+    """API trade records, built from whole columns converted to Python values at once"""
+    count = len(trades_df)
+    columns = {}
+    for field in TIME_FIELDS:
+        columns[field] = _iso_strings(trades_df[field]) if field in trades_df.columns else [None] * count
+    for field in PRICE_FIELDS:
+        columns[field] = _numbers(trades_df, field).tolist()
+    columns['pnl'] = pnl.tolist()
+    if 'exit_reason' in trades_df.columns:
+        reasons = trades_df['exit_reason'].astype(object)
+        columns['exit_reason'] = reasons.where(reasons.notna(), None).tolist()
+    else:
+        columns['exit_reason'] = [None] * count
+    for field in STRIKE_FIELDS:
+        columns[field] = _numbers(trades_df, field).astype(np.int64).tolist()
+    for field in LEG_PRICE_FIELDS:
+        columns[field] = _numbers(trades_df, field).tolist()
+    if 'legs' in trades_df.columns:
+        columns['legs'] = trades_df['legs'].tolist()  # per-leg detail of multi-leg strategies
+
+    keys = list(columns)
+    return [dict(zip(keys, row)) for row in zip(*columns.values())]
+
+
+def compute_metrics(trades_df: pd.DataFrame, trading_days: Optional[Sequence] = None,
+                    include_trades: bool = True) -> Dict[str, Any]:
+    """Every backtest metric of a non-empty trade frame, plus the serialized trades"""
+    column = pnl_column(trades_df)
+    pnl = pd.to_numeric(trades_df[column], errors='coerce').fillna(0.0).to_numpy(dtype=float)
+
+    entry_days = session_days(trades_df['entry_time'])
+    exit_days = session_days(trades_df['exit_time']) if 'exit_time' in trades_df.columns else entry_days
+    exit_days = np.where(np.isnat(exit_days), entry_days, exit_days)
+
+    metrics = {
+        'success': True,
+        **trade_metrics(pnl),
+        **daily_metrics(exit_days, pnl, trading_days),
+        **period_breakdowns(entry_days, pnl),
+    }
+    if include_trades:
+        metrics['trades'] = serialize_trades(trades_df, pnl)
+    return metrics
+
+
+def backtest_metrics(trades_df: pd.DataFrame, trading_days: Optional[Sequence] = None,
+                     include_trades: bool = True) -> Dict[str, Any]:
+    """compute_metrics, or the empty result when the backtest produced no trades"""
+    if trades_df.empty:
+        return {
+            'success': False,
+            'error': 'No trades generated',
+            'total_trades': 0,
+            'winning_trades': 0,
+            'losing_trades': 0,
+            'win_rate': 0.0,
+            'total_pnl': 0.0,
+            'max_drawdown': 0.0,
+            'sharpe_ratio': 0.0,
+            'trades': []
+        }
+    return compute_metrics(trades_df, trading_days, include_trades)
@@ -0,0 +1,313 @@
+import os
+import re
+from datetime import datetime, time, timedelta
+from typing import Any, Dict, List
+
+import numpy as np
+import pandas as pd
+
+from engine.catalog import read_date_column
+from engine.exits import align_ltp, last_valid_index
+from engine.kernels import evaluate_exit
+from engine.prefetch import LAST_ENTRY_TIME, plan_option_legs
+from engine.simulation import (
+    ENTRY_TICK, MinuteGrid, expiry_pair, expiry_values_of, leg_request, leg_ticks_after,
+    simulate_trades_with_stoploss_extended
+)
+
+# Generic N-leg option strategies built from StrategyConfig.legs (LegConfig dicts).
+#
+# Legs are held as aligned arrays (one slot per leg): signed quantity, strike rule,
+# per-leg target / stop. For each trade the legs' LTPs are aligned to the minute
+# grid as an (n candles, k legs) matrix, leg PnL is one broadcast
+# (ltp - entry) * signed_qty, and the exit is found by engine.kernels.evaluate_exit.
+#
+# LegConfig fields:
+#   position                  Buy / Sell
+#   optionType                CE / PE (Call / Put)
+#   strike                    ATM, ATM+100, ATM-50, ITM1, OTM2 or an absolute strike
+#   strikeSelectionParameter  "Points" reads strike as a signed offset from ATM in points
+#   expiry                    Weekly (nearest), Next Weekly, Monthly (last of the month)
+#   lotSize                   number of lots (0 = 1); a lot is config['lot_size'] units
+#   targetProfit / stopLoss   per-leg PnL in rupees, used when legwise exits are on
+
+STRIKE_STEP = 50
+EXPIRY_DATES_CSV = 'files/expiry_dates.csv'  # full calendar for next-weekly / monthly expiries past the window
+LEG_SQUAREOFF = 'leg_squareoff'  # legwise square-off of every leg once one leg exits
+
+SQUAREOFF_ALL = ('all', 'all legs', 'complete', 'square off all legs')
+POINT_SELECTIONS = ('points', 'atm points', 'atm point', 'point', 'offset')
+
+_STRIKE_PATTERN = re.compile(r'^(ATM|ITM|OTM)\s*([+-]?\s*\d+)?$')
+
+
+def _side(position) -> int:
+    text = str(position or '').strip().lower()
+    if text in ('buy', 'long', 'b'):
+        return 1
+    if text in ('sell', 'short', 's'):
+        return -1
+    raise ValueError(f"Leg position must be Buy or Sell, got {position!r}")
+
+
+def _option_type(option_type) -> str:
+    text = str(option_type or '').strip().upper()
+    if text in ('CE', 'CALL', 'C'):
+        return 'CE'
+    if text in ('PE', 'PUT', 'P'):
+        return 'PE'
+    raise ValueError(f"Leg optionType must be CE or PE, got {option_type!r}")
+
+
+def _strike_rule(strike, selection, option_type):
+    """(offset from ATM in points, absolute strike or 0)"""
+    text = str(strike if strike not in (None, '') else 'ATM').strip().upper().replace(' ', '')
+    if str(selection or '').strip().lower() in POINT_SELECTIONS:
+        return int(float(text)), 0
+
+    match = _STRIKE_PATTERN.match(text)
+    if match:
+        kind, amount = match.group(1), int(match.group(2) or 0)
+        if kind == 'ATM':
+            return amount, 0
+        # OTM is above the spot for calls and below it for puts; ITM the other way round
+        direction = 1 if (kind == 'OTM') == (option_type == 'CE') else -1
+        return direction * amount * STRIKE_STEP, 0
+    try:
+        return 0, int(float(text))
+    except ValueError:
+        raise ValueError(f"Unknown strike selection: {strike!r}")
+
+
+def _expiry_rule(expiry) -> str:
+    text = str(expiry or 'weekly').strip().lower()
+    if text in ('weekly', 'current', 'current week', 'current weekly', 'nearest'):
+        return 'weekly'
+    if text in ('next weekly', 'next week', 'next'):
+        return 'next_weekly'
+    if text in ('monthly', 'current month', 'current monthly'):
+        return 'monthly'
+    raise ValueError(f"Unknown leg expiry: {expiry!r}")
+
+
+class LegBook:
+    """The legs of a strategy as aligned arrays"""
+
+    def __init__(self, legs: List[Dict[str, Any]], lot_size: int):
+        if not legs:
+            raise ValueError("A multi-leg strategy needs at least one leg")
+        self.names, self.option_types, self.expiries = [], [], []
+        signed_qty, offsets, absolute, targets, stops = [], [], [], [], []
+
+        for number, leg in enumerate(legs, start=1):
+            leg = leg if isinstance(leg, dict) else leg.dict()
+            if str(leg.get('segment') or 'options').strip().lower() not in ('options', 'option', 'opt'):
+                raise ValueError(f"Only option legs are supported, got segment {leg.get('segment')!r}")
+            option_type = _option_type(leg.get('optionType'))
+            offset, strike = _strike_rule(leg.get('strike'), leg.get('strikeSelectionParameter'), option_type)
+
+            self.names.append(leg.get('legSegmentName') or f"Leg {number}")
+            self.option_types.append(option_type)
+            self.expiries.append(_expiry_rule(leg.get('expiry')))
+            signed_qty.append(_side(leg.get('position')) * (float(leg.get('lotSize') or 0) or 1.0) * lot_size)
+            offsets.append(offset)
+            absolute.append(strike)
+            targets.append(float(leg.get('targetProfit') or 0))
+            stops.append(float(leg.get('stopLoss') or 0))
+
+        self.signed_qty = np.array(signed_qty, dtype=np.float64)
+        self.strike_offset = np.array(offsets, dtype=np.int64)
+        self.absolute_strike = np.array(absolute, dtype=np.int64)
+        self.target = np.array(targets, dtype=np.float64)
+        self.stop = np.array(stops, dtype=np.float64)
+
+    def __len__(self):
+        return len(self.names)
+
+    def strikes(self, spot_price) -> np.ndarray:
+        atm = round(spot_price / STRIKE_STEP) * STRIKE_STEP
+        return np.where(self.absolute_strike > 0, self.absolute_strike, atm + self.strike_offset)
+
+    def expiry_dates_for(self, expiry_dates, expiry_values, calendar, execution_date) -> list:
+        """
+        Expiry of each leg. The nearest (weekly) expiry comes from the backtest window,
+        as in the spread engine; next weekly and monthly are looked up in the full
+        calendar, since they can fall after the window's end.
+        """
+        base, _ = expiry_pair(expiry_dates, expiry_values, execution_date)
+        base_value = np.datetime64(base, 'D')
+        position = int(np.searchsorted(calendar, base_value, side='right'))
+        following = pd.Timestamp(calendar[position]).date() if position < len(calendar) else base
+        month = calendar[calendar.astype('datetime64[M]') == np.datetime64(base, 'M')]
+        monthly = pd.Timestamp(month.max()).date() if len(month) else base
+        chosen = {'weekly': base, 'next_weekly': following, 'monthly': monthly}
+        return [chosen[rule] for rule in self.expiries]
+
+    def requests(self, create_symbol_format_fn, expiries, strikes, execution_date) -> list:
+        return [leg_request(create_symbol_format_fn, expiry, int(strike), execution_date, option_type)
+                for expiry, strike, option_type in zip(expiries, strikes, self.option_types)]
+
+
+def expiry_calendar(expiry_values, csv_path=EXPIRY_DATES_CSV) -> np.ndarray:
+    """Sorted datetime64[D] expiries of the whole calendar file merged with the window's own"""
+    if not os.path.exists(csv_path):
+        return expiry_values
+    return np.union1d(expiry_values, read_date_column(csv_path, 'expiry_date').astype('datetime64[D]'))
+
+
+def no_reentry_cutoff(config) -> time:
+    """Last entry time: noReentryAfter (HH:MM) when set, never later than the 15:00 cut-off"""
+    value = config.get('no_reentry_after')
+    if not value:
+        return LAST_ENTRY_TIME
+    return min(datetime.strptime(str(value).strip()[:5], '%H:%M').time(), LAST_ENTRY_TIME)
+
+
+def plan_multileg_legs(entries_df, expiry_dates, config, create_symbol_format_fn):
+    """Every option fetch simulate_multileg_trades can make, for prefetch_option_legs"""
+    book = LegBook(config['legs'], config['lot_size'])
+    expiry_values = expiry_values_of(expiry_dates)
+    calendar = expiry_calendar(expiry_values)
+    cutoff = no_reentry_cutoff(config)
+    requests = {}
+
+    for row in entries_df.itertuples(index=False):
+        entry_time = row.execution_time
+        if entry_time.time() >= cutoff:
+            continue
+        execution_date = entry_time.date()
+        try:
+            expiries = book.expiry_dates_for(expiry_dates, expiry_values, calendar, execution_date)
+        except (IndexError, ValueError):
+            continue
+        for request in book.requests(create_symbol_format_fn, expiries, book.strikes(row.execution_open), execution_date):
+            requests[request] = None
+
+    return list(requests)
+
+
+def _plain(value):
+    return None if value is None or pd.isna(value) else float(value)
+
+
+def simulate_multileg_trades(entries_df, df_1min, expiry_dates, fetch_option_data_fn, create_symbol_format_fn, config):
+    """
+    N-leg option simulation for strategies with config['legs'].
+
+    Exits: legwise targets / stops when legwise_exit is on (with legwise_squareoff
+    'all' the whole position closes on the first leg exit), total target, total stop,
+    trailing stop and max hold. Unless overlap_entry_allowed, a new entry waits for
+    the previous trade to close; no entries after no_reentry_after.
+    """
+    print("--- Starting Multi-Leg Simulation ---")
+    book = LegBook(config['legs'], config['lot_size'])
+    grid = MinuteGrid(df_1min)
+    expiry_values = expiry_values_of(expiry_dates)
+    calendar = expiry_calendar(expiry_values)
+    cutoff = no_reentry_cutoff(config)
+    overlap = bool(config.get('overlap_entry_allowed'))
+    legwise = bool(config.get('legwise_exit'))
+    squareoff_all = legwise and str(config.get('legwise_squareoff') or '').strip().lower() in SQUAREOFF_ALL
+    exit_params = {
+        'legwise': legwise,
+        'leg_target': book.target,
+        'leg_stop': book.stop,
+        'total_target': config.get('total_target', 0),
+        'total_stop': config.get('total_stop_loss', 0),
+        'trailing_sl': config.get('trailing_sl', 0),
+        'max_hold': config['max_hold'],
+    }
+
+    trades = []
+    next_trade_start_time = None
+    for index, row in enumerate(entries_df.itertuples(index=False)):
+        entry_time = row.execution_time
+        if not overlap and next_trade_start_time and entry_time <= next_trade_start_time:
+            continue
+        if entry_time.time() >= cutoff:
+            continue
+
+        execution_date = entry_time.date()
+        entry_seconds = entry_time.hour * 3600 + entry_time.minute * 60 + entry_time.second
+        try:
+            expiries = book.expiry_dates_for(expiry_dates, expiry_values, calendar, execution_date)
+            strikes = book.strikes(row.execution_open)
+            requests = book.requests(create_symbol_format_fn, expiries, strikes, execution_date)
+
+            positions = grid.window(entry_time, config['max_hold'])
+            candle_secs = grid.seconds[positions]
+            ltp = np.empty((len(positions), len(book)))
+            entry_ltp = np.empty(len(book))
+            for j, request in enumerate(requests):
+                secs, ltps = leg_ticks_after(fetch_option_data_fn(*request), entry_seconds)
+                entry_ltp[j] = ltps[ENTRY_TICK]
+                ltp[:, j] = align_ltp(secs, ltps, candle_secs)[0]
+
+            # (n, k) leg PnL; NaN wherever a leg has no quote
+            leg_pnl = (ltp - entry_ltp) * book.signed_qty
+            exit_idx, exit_reason, _, leg_exit = evaluate_exit(grid.low[positions], leg_pnl, exit_params)
+
+            exited = leg_exit[leg_exit >= 0]
+            if squareoff_all and len(exited) and (exit_idx < 0 or exited.min() < exit_idx):
+                exit_idx, exit_reason = int(exited.min()), LEG_SQUAREOFF
+                leg_exit = np.where(leg_exit == exit_idx, leg_exit, -1)
+
+            # Each leg closes at its own exit candle, else at its last quote up to the trade's exit
+            end = exit_idx if exit_idx >= 0 else len(positions) - 1
+            leg_exit_prices = np.full(len(book), np.nan)
+            leg_exit_times = [None] * len(book)
+            for j in range(len(book)):
+                at = leg_exit[j] if 0 <= leg_exit[j] <= end else (last_valid_index(~np.isnan(ltp[:, j]))[end] if end >= 0 else -1)
+                if at >= 0:
+                    leg_exit_prices[j] = ltp[at, j]
+                    leg_exit_times[j] = grid.dates[positions[at]].isoformat()
+            leg_totals = (leg_exit_prices - entry_ltp) * book.signed_qty
+            trade_pnl = float(leg_totals.sum()) if not np.isnan(leg_totals).any() else None
+
+            exit_time = exit_price = None
+            if exit_idx >= 0:
+                exit_time = grid.dates[positions[exit_idx]]
+                exit_price = grid.close[positions[exit_idx]]
+                print(f"[Entry {index+1}] {entry_time} -> [Exit - {exit_reason}] {exit_time} | PnL: {trade_pnl}")
+
+            trades.append({
+                'signal_time': row.signal_time,
+                'entry_time': entry_time,
+                'entry_price': row.execution_open,
+                'exit_time': exit_time,
+                'exit_price': exit_price,
+                'exit_reason': exit_reason,
+                'pnl': trade_pnl,
+                'net_option_pnl': trade_pnl,
+                'expiry': str(expiries[0]),
+                'legs': [
+                    {
+                        'name': book.names[j],
+                        'option_type': book.option_types[j],
+                        'position': 'Buy' if book.signed_qty[j] > 0 else 'Sell',
+                        'quantity': abs(float(book.signed_qty[j])),
+                        'strike': int(strikes[j]),
+                        'expiry': str(expiries[j]),
+                        'entry_price': _plain(entry_ltp[j]),
+                        'exit_price': _plain(leg_exit_prices[j]),
+                        'exit_time': leg_exit_times[j],
+                        'pnl': _plain(leg_totals[j]),
+                    }
+                    for j in range(len(book))
+                ],
+            })
+            if exit_time is not None:
+                next_trade_start_time = exit_time + timedelta(minutes=1)
+
+        except Exception as e:
+            print("Error:", e)
+            continue
+
+    return pd.DataFrame(trades)
+
+
+def simulation_for(config):
+    """(option leg planner, simulation function) for a validated config"""
+    if config.get('legs'):
+        return plan_multileg_legs, simulate_multileg_trades
+    return plan_option_legs, simulate_trades_with_stoploss_extended
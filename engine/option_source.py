@@ -0,0 +1,47 @@
+import os
+
+import tick_store
+import zip_read
+from config.settings import settings
+
+# Where backtests read option ticks from, chosen by settings:
+#   OPTION_TICK_STORE_PATH  root of the Parquet store built by tick_store.py; days
+#                           found there are read from it, anything else from the ZIPs
+#   ARCHIVE_INDEX_PATH      archive_index.py database; single-CSV ZIP reads seek straight
+#                           to the CSV bytes instead of listing the monthly and daily ZIPs
+# Both are off when unset, which leaves the plain ZIP archive reads.
+
+if settings.OPTION_TICK_STORE_PATH:
+    tick_store.store_folder = settings.OPTION_TICK_STORE_PATH
+
+_index_pid = None
+
+
+def _use_index():
+    # SQLite connections must not cross a fork, so each process opens its own
+    global _index_pid
+    if settings.ARCHIVE_INDEX_PATH and _index_pid != os.getpid():
+        zip_read.use_archive_index(settings.ARCHIVE_INDEX_PATH)
+        _index_pid = os.getpid()
+
+
+def fetch_option_data(target_csv_name, date_str, symbol):
+    """ Same signature as zip_read.fetch_csv_from_zip, reading from the configured sources """
+    if settings.OPTION_TICK_STORE_PATH:
+        df = tick_store.fetch_csv_from_zip(target_csv_name, date_str, symbol)
+        if df is not None:
+            return df
+    _use_index()
+    return zip_read.fetch_csv_from_zip(target_csv_name, date_str, symbol)
+
+
+def fetch_many_option_data(requests):
+    """ Same contract as zip_read.fetch_many_from_zip; the ZIPs are only read for what the store lacks """
+    results = {}
+    if settings.OPTION_TICK_STORE_PATH:
+        results = tick_store.fetch_many(requests)
+        requests = [request for request in requests if (request[0], request[1]) not in results]
+    if requests:
+        _use_index()
+        results.update(zip_read.fetch_many_from_zip(requests))
+    return results
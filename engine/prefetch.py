@@ -0,0 +1,77 @@
+from datetime import time
+
+from engine.simulation import expiry_pair, expiry_values_of, get_option_strikes, leg_request
+from zip_read import fetch_csv_from_zip, fetch_many_from_zip, create_symbol_format
+
+LAST_ENTRY_TIME = time(15, 0)  # Same cut-off the simulation applies to entries
+
+
+def plan_option_legs(entries_df, expiry_dates, config, create_symbol_format_fn=create_symbol_format):
+    """
+    Every option fetch the simulation can make for these entries, as
+    (target_csv_name, date_str, symbol) tuples without duplicates.
+
+    Each entry needs the sell and buy PE at the nearest expiry, plus both legs at
+    the next expiry in case the premium check switches over. Entries skipped later
+    because an earlier trade is still open are planned too; the extra reads are
+    cheaper than a second pass.
+    """
+    expiry_values = expiry_values_of(expiry_dates)
+    requests = {}
+
+    for row in entries_df.itertuples(index=False):
+        entry_time = row.execution_time
+        if entry_time.time() >= LAST_ENTRY_TIME:
+            continue
+
+        execution_date = entry_time.date()
+        try:
+            base_expiry, next_expiry = expiry_pair(expiry_dates, expiry_values, execution_date)
+        except IndexError:
+            continue  # no listed expiry on or after this date; the simulation skips it as well
+
+        strikes = get_option_strikes(row.execution_open, config)
+        for expiry in dict.fromkeys([base_expiry, next_expiry]):
+            for strike in (strikes['sell_pe'], strikes['buy_pe']):
+                request = leg_request(create_symbol_format_fn, expiry, strike, execution_date)
+                requests[request] = None
+
+    return list(requests)
+
+
+class PrefetchedLegs:
+    """
+    In-memory option frames with the same call signature as fetch_csv_from_zip,
+    so it can be passed straight to the simulation as fetch_option_data_fn.
+    Anything that was not prefetched falls back to fallback_fn.
+    """
+
+    def __init__(self, frames, fallback_fn=fetch_csv_from_zip):
+        self.frames = frames
+        self.fallback_fn = fallback_fn
+
+    def __call__(self, target_csv_name, date_str, symbol):
+        df = self.frames.get((target_csv_name, date_str))
+        if df is None and self.fallback_fn is not None:
+            df = self.fallback_fn(target_csv_name, date_str, symbol)
+            if df is not None:
+                self.frames[(target_csv_name, date_str)] = df
+        return df
+
+    def __len__(self):
+        return len(self.frames)
+
+
+def prefetch_option_legs(entries_df, expiry_dates, config,
+                         create_symbol_format_fn=create_symbol_format,
+                         bulk_fetch_fn=fetch_many_from_zip,
+                         fallback_fn=fetch_csv_from_zip,
+                         plan_fn=plan_option_legs):
+    """
+    Plan (with plan_fn, the planner matching the simulation that will run) and
+    bulk-load every option leg of a backtest; returns a PrefetchedLegs fetch function
+    """
+    requests = plan_fn(entries_df, expiry_dates, config, create_symbol_format_fn)
+    frames = bulk_fetch_fn(requests) if requests else {}
+    print(f"--- Prefetched {len(frames)}/{len(requests)} option legs ---")
+    return PrefetchedLegs(frames, fallback_fn)
@@ -0,0 +1,60 @@
+import pandas as pd
+
+SESSION_OPEN_MINUTES = 9 * 60 + 15  # NSE cash/F&O session opens at 09:15
+
+# Kite interval names -> bar length in minutes (None = one bar per trading day)
+TIMEFRAME_MINUTES = {
+    'minute': 1,
+    '3minute': 3,
+    '5minute': 5,
+    '10minute': 10,
+    '15minute': 15,
+    '30minute': 30,
+    '60minute': 60,
+    'day': None,
+}
+
+OHLC_AGGREGATION = {'open': 'first', 'high': 'max', 'low': 'min', 'close': 'last', 'volume': 'sum'}
+
+
+def timeframe_minutes(timeframe):
+    """Bar length in minutes for a Kite interval name, 'Nminute' string or integer (StrategyConfig.timeFrame)"""
+    if isinstance(timeframe, (int, float)) and not isinstance(timeframe, bool):
+        minutes = int(timeframe)
+    elif timeframe in TIMEFRAME_MINUTES:
+        return TIMEFRAME_MINUTES[timeframe]
+    elif isinstance(timeframe, str) and timeframe.endswith('minute') and timeframe[:-len('minute')].isdigit():
+        minutes = int(timeframe[:-len('minute')])
+    elif isinstance(timeframe, str) and timeframe.isdigit():
+        minutes = int(timeframe)
+    else:
+        raise ValueError(f"Unsupported timeframe: {timeframe}")
+
+    if minutes <= 0:
+        raise ValueError(f"Unsupported timeframe: {timeframe}")
+    return minutes
+
+
+def resample_candles(df_1min, timeframe):
+    """
+    Build higher-timeframe candles from 1-minute candles.
+
+    Intraday bars are anchored at the 09:15 session open, so 15-minute bars start at
+    09:15, 09:30, ... and hourly bars at 09:15, 10:15, ... like Kite's own candles;
+    daily bars are stamped at midnight. The last bar of a session may be partial.
+    """
+    minutes = timeframe_minutes(timeframe)
+    if minutes == 1 or df_1min.empty:
+        return df_1min.copy()
+
+    dates = df_1min['date']
+    day = dates.dt.normalize()
+    if minutes is None:
+        bucket = day
+    else:
+        since_open = (dates - day) // pd.Timedelta(minutes=1) - SESSION_OPEN_MINUTES
+        bucket = day + pd.to_timedelta(SESSION_OPEN_MINUTES + (since_open // minutes) * minutes, unit='min')
+
+    aggregation = {column: how for column, how in OHLC_AGGREGATION.items() if column in df_1min.columns}
+    resampled = df_1min.groupby(bucket.rename('date'), sort=True).agg(aggregation)
+    return resampled.reset_index()
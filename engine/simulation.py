@@ -0,0 +1,214 @@
+import numpy as np
+import pandas as pd
+from datetime import timedelta, time
+from engine.exits import (
+    SESSION_END_SECONDS, STOP_LOSS, TARGET_HIT, TIME_EXIT,
+    align_ltp, last_valid_index, tick_seconds, time_of_day_seconds
+)
+from engine.kernels import evaluate_exit
+from engine.catalog import dates_between, read_date_column
+
+ENTRY_TICK = 3  # Entry LTP is the 4th tick after entry to simulate slippage
+
+
+def load_expiry_dates_from_csv(csv_path, start_date, end_date):
+    """Expiry dates (column `expiry_date`, YYYY-MM-DD) within the backtest window, ascending"""
+    expiries = dates_between(read_date_column(csv_path, 'expiry_date'), start_date, end_date)
+    # .date() values so comparisons work with datetime.date
+    return pd.DataFrame({'expiry_date': pd.to_datetime(pd.Series(expiries, dtype=object)).dt.date})
+
+
+def get_option_strikes(spot_price, config):
+    """ATM, sell PE and buy PE strikes for the bull put credit spread"""
+    atm = round(spot_price / 50) * 50
+    sell_pe = atm - config['sell_otm']
+    buy_pe = sell_pe - config['spread']
+    return {'atm': atm, 'sell_pe': sell_pe, 'buy_pe': buy_pe}
+
+
+class MinuteGrid:
+    """1-minute spot candles as contiguous arrays, built once per simulation"""
+
+    def __init__(self, df_1min: pd.DataFrame):
+        self.dates = df_1min['date'].reset_index(drop=True)
+        self.index = pd.DatetimeIndex(self.dates)
+        self.close = df_1min['close'].to_numpy(dtype=np.float64)
+        self.low = df_1min['low'].to_numpy(dtype=np.float64)
+        self.seconds = time_of_day_seconds(self.dates)
+        self.in_session = self.seconds < SESSION_END_SECONDS
+        # Running count of in-session candles, used to bound each trade's window to max_hold candles
+        self.session_count = np.cumsum(self.in_session)
+
+    def window(self, entry_time, max_hold):
+        """
+        Positions of the in-session candles a trade entered at entry_time can hold
+        through; max_hold below 1 still holds one candle, as in evaluate_exit
+        """
+        start = self.index.searchsorted(entry_time, side='left')
+        already = self.session_count[start - 1] if start > 0 else 0
+        stop = np.searchsorted(self.session_count, already + max(int(max_hold), 1), side='left') + 1
+        positions = np.arange(start, min(stop, len(self.dates)))
+        return positions[self.in_session[positions]]
+
+
+def leg_ticks_after(tick_df, entry_seconds):
+    """(seconds, LTP) arrays of the ticks strictly after the entry time; ticks are in time order"""
+    secs = tick_seconds(tick_df)
+    start = int(np.searchsorted(secs, entry_seconds, side='right'))
+    return secs[start:], tick_df['LTP'].to_numpy(dtype=np.float64)[start:]
+
+
+def expiry_pair(expiry_dates, expiry_values, execution_date):
+    """(base, next) expiry for a trade date; next falls back to base on the last listed expiry"""
+    base_expiry_idx = int(np.searchsorted(expiry_values, np.datetime64(execution_date, 'D'), side='left'))
+    base_expiry = expiry_dates.iloc[base_expiry_idx]['expiry_date']
+    next_expiry = expiry_dates.iloc[base_expiry_idx + 1]['expiry_date'] if base_expiry_idx + 1 < len(expiry_dates) else base_expiry
+    return base_expiry, next_expiry
+
+
+def expiry_values_of(expiry_dates):
+    return np.array(expiry_dates['expiry_date'].tolist(), dtype='datetime64[D]')
+
+
+def leg_request(create_symbol_format_fn, expiry, strike, execution_date, option_type='PE'):
+    """(target_csv_name, date_str, symbol) arguments of the option fetch for one leg"""
+    leg = {'name': 'NIFTY', 'expiry': str(expiry), 'strike': strike, 'instrument_type': option_type}
+    return create_symbol_format_fn(leg, str(execution_date))
+
+
+def fetch_leg(fetch_option_data_fn, create_symbol_format_fn, expiry, strike, execution_date):
+    return fetch_option_data_fn(*leg_request(create_symbol_format_fn, expiry, strike, execution_date))
+
+
+def simulate_trades_with_stoploss_extended(entries_df, df_1min, expiry_dates, fetch_option_data_fn, create_symbol_format_fn, config):
+    """
+    Bull put credit spread simulation with an array-based exit engine.
+
+    Leg LTPs are aligned to the 1-minute spot grid with one binary search per leg,
+    and the first target / stop-loss / max-hold bar is found with vectorized
+    comparisons instead of re-filtering both tick frames on every candle.
+    """
+    print("--- Starting Trade Simulation ---")
+    trades = []
+    next_trade_start_time = None
+
+    grid = MinuteGrid(df_1min)
+    expiry_values = expiry_values_of(expiry_dates)
+    target_pnl = config['max_profit_per_lot'] * config['lot_size']
+
+    for index, row in enumerate(entries_df.itertuples(index=False)):
+        print(f"[Entry {index+1}] Signal Time: {row.signal_time} | Spot: {row.execution_open:.2f}")
+        signal_time = row.execution_time
+        if next_trade_start_time and signal_time <= next_trade_start_time:
+            continue
+        if signal_time.time() >= time(15, 0):
+            continue
+
+        entry_time = signal_time
+        entry_price = row.execution_open
+        sl_price = entry_price * (1 - config['spot_sl_pct'])
+        execution_date = entry_time.date()
+        entry_seconds = entry_time.hour * 3600 + entry_time.minute * 60 + entry_time.second
+
+        try:
+            base_expiry, next_expiry = expiry_pair(expiry_dates, expiry_values, execution_date)
+
+            strikes = get_option_strikes(entry_price, config)
+
+            # Premium check on the sell strike of the nearest expiry
+            test_sell_data = fetch_leg(fetch_option_data_fn, create_symbol_format_fn, base_expiry, strikes['sell_pe'], execution_date)
+            _, test_sell_ltp = leg_ticks_after(test_sell_data, entry_seconds)
+            test_sell_price = test_sell_ltp[ENTRY_TICK]
+
+            if test_sell_price < config['min_premium']:
+                print(f"Premium {test_sell_price:.2f} < {config['min_premium']} — Switching to next expiry.")
+                valid_expiry = next_expiry
+            else:
+                valid_expiry = base_expiry
+
+            otm_buy_data = fetch_leg(fetch_option_data_fn, create_symbol_format_fn, valid_expiry, strikes['buy_pe'], execution_date)
+            otm_sell_data = fetch_leg(fetch_option_data_fn, create_symbol_format_fn, valid_expiry, strikes['sell_pe'], execution_date)
+            buy_secs, buy_ltps = leg_ticks_after(otm_buy_data, entry_seconds)
+            sell_secs, sell_ltps = leg_ticks_after(otm_sell_data, entry_seconds)
+
+            buy_leg_entry_price = buy_ltps[ENTRY_TICK]
+            sell_leg_entry_price = sell_ltps[ENTRY_TICK]
+            print(f"Buy PE Strike: {strikes['buy_pe']} | Entry Price: {buy_leg_entry_price:.2f}")
+            print(f"Sell PE Strike: {strikes['sell_pe']} | Entry Price: {sell_leg_entry_price:.2f}")
+
+            # Align both legs to the candles this trade can live through
+            positions = grid.window(entry_time, config['max_hold'])
+            candle_secs = grid.seconds[positions]
+            buy_ltp, buy_valid = align_ltp(buy_secs, buy_ltps, candle_secs)
+            sell_ltp, sell_valid = align_ltp(sell_secs, sell_ltps, candle_secs)
+            quoted = buy_valid & sell_valid
+            pnl = ((sell_leg_entry_price - sell_ltp) - (buy_leg_entry_price - buy_ltp)) * config['lot_size']
+
+            # The spread is passed as a single leg so the kernel sees exactly the loop's PnL values
+            exit_idx, exit_reason, _, _ = evaluate_exit(grid.low[positions], np.where(quoted, pnl, np.nan), {
+                'total_target': target_pnl,
+                'total_stop': config.get('total_stop_loss', 0),
+                'trailing_sl': config.get('trailing_sl', 0),
+                'spot_sl': sl_price,
+                'max_hold': config['max_hold'],
+            })
+            if exit_idx < 0:
+                exit_idx = None  # still open at the end of the data; recorded with no exit
+
+            # Leg prices and PnL come from the last candle where both legs were quoted
+            last_quoted = last_valid_index(quoted)
+            quote_idx = last_quoted[exit_idx] if exit_idx is not None else (last_quoted[-1] if len(last_quoted) else -1)
+
+            exit_time = exit_price = buy_leg_exit_price = sell_leg_exit_price = None
+            if quote_idx >= 0:
+                buy_leg_exit_price, sell_leg_exit_price = buy_ltp[quote_idx], sell_ltp[quote_idx]
+
+            if exit_idx is not None:
+                exit_time = grid.dates[positions[exit_idx]]
+                if exit_reason == TARGET_HIT:
+                    exit_price = grid.close[positions[exit_idx]]
+                    print(f"[Exit - Target] Time: {exit_time} | Spot: {exit_price:.2f} | PnL: {pnl[exit_idx]:.2f}")
+                elif exit_reason == STOP_LOSS:
+                    exit_price = sl_price
+                    print(f"[Exit - Stop Loss] Time: {exit_time} | Spot: {grid.close[positions[exit_idx]]:.2f} <= SL: {sl_price:.2f}")
+                elif exit_reason == TIME_EXIT:
+                    exit_price = grid.close[positions[exit_idx]]
+                    print(f"[Exit - Max Hold] Time: {exit_time} | Total Minutes: {exit_idx + 1}")
+                else:
+                    exit_price = grid.close[positions[exit_idx]]
+                    print(f"[Exit - {exit_reason}] Time: {exit_time} | PnL: {pnl[exit_idx]:.2f}")
+
+            if quote_idx >= 0:
+                trade_pnl = pnl[quote_idx]
+            elif exit_price is not None:
+                trade_pnl = (exit_price - entry_price) * config['lot_size']
+            else:
+                trade_pnl = None
+
+            trades.append({
+                'signal_time': row.signal_time,
+                'entry_time': entry_time,
+                'entry_price': entry_price,
+                'exit_time': exit_time,
+                'exit_price': exit_price,
+                'exit_reason': exit_reason,
+                'sl_price': sl_price,
+                'pnl': trade_pnl,
+                'expiry': str(valid_expiry),
+                'opttype': 'PE',
+                'buy_leg_strike': strikes['buy_pe'],
+                'sell_leg_strike': strikes['sell_pe'],
+                'buy_leg_entry_price': buy_leg_entry_price,
+                'sell_leg_entry_price': sell_leg_entry_price,
+                'buy_leg_exit_price': buy_leg_exit_price,
+                'sell_leg_exit_price': sell_leg_exit_price,
+                'net_option_pnl': ((sell_leg_entry_price - sell_leg_exit_price) - (buy_leg_entry_price - buy_leg_exit_price)) * config['lot_size'] if buy_leg_exit_price is not None and sell_leg_exit_price is not None else None,
+            })
+            if exit_time is not None:
+                next_trade_start_time = exit_time + timedelta(minutes=1)
+
+        except Exception as e:
+            print("Error:", e)
+            continue
+
+    return pd.DataFrame(trades)
@@ -0,0 +1,158 @@
+import io
+import os
+import itertools
+import contextlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from engine.config import validate_config
+from engine.entries import match_signals_with_1min
+from engine.indicators import generate_signals
+from engine.market_data import candle_data_version, fetch_max_data_zerodha
+from engine.metrics import backtest_metrics
+from engine.prefetch import PrefetchedLegs
+from engine.resample import resample_candles
+from engine.multileg import simulation_for
+from engine.simulation import load_expiry_dates_from_csv
+from engine.option_source import fetch_option_data, fetch_many_option_data
+from zip_read import create_symbol_format
+
+# Read-only data shared with every worker process. It is sent once per worker
+# through the pool initializer rather than pickled with every task.
+_shared: Dict[str, Any] = {}
+
+
+def expand_grid(param_grid: Dict[str, List[Any]]) -> List[Dict[str, Any]]:
+    """{'spread': [150, 200], 'max_hold': [60, 120]} -> list of 4 parameter dicts"""
+    keys = list(param_grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*(param_grid[key] for key in keys))]
+
+
+def load_sweep_data(base_config: Dict[str, Any], start_date: str, end_date: str,
+                    fetch_option_data_fn: Callable = fetch_option_data,
+                    create_symbol_format_fn: Callable = create_symbol_format,
+                    bulk_fetch_fn: Optional[Callable] = fetch_many_option_data) -> Dict[str, Any]:
+    """Fetch spot candles and expiries once for every combination of a sweep"""
+    config = validate_config(base_config)
+    df_1min = fetch_max_data_zerodha(config['instrument_token'], start_date, end_date, 'minute')
+    return {
+        'base_config': config,
+        'interval_df': resample_candles(df_1min, config['timeframe']),
+        'df_1min': df_1min,
+        'expiry_dates': load_expiry_dates_from_csv('files/expiry_dates.csv', start_date, end_date),
+        'fetch_option_data_fn': fetch_option_data_fn,
+        'create_symbol_format_fn': create_symbol_format_fn,
+        'bulk_fetch_fn': bulk_fetch_fn,
+        'data_version': candle_data_version(config['instrument_token'], start_date, end_date, 'minute'),
+    }
+
+
+def _init_worker(shared_data: Dict[str, Any]) -> None:
+    global _shared
+    _shared = shared_data
+
+
+def _combination_config(params: Dict[str, Any], data: Dict[str, Any]) -> Dict[str, Any]:
+    return validate_config({**data['base_config'], **params})
+
+
+def _entries_for(config: Dict[str, Any], data: Dict[str, Any]):
+    # Timeframe can itself be swept; other bars are derived from the shared 1-minute data
+    interval_df = data['interval_df']
+    if config['timeframe'] != data['base_config']['timeframe']:
+        interval_df = resample_candles(data['df_1min'], config['timeframe'])
+    df_signals = generate_signals(interval_df, config, data_version=data.get('data_version'))
+    return match_signals_with_1min(df_signals)
+
+
+def prefetch_sweep_legs(combinations: List[Dict[str, Any]], shared_data: Dict[str, Any]) -> Dict[Any, Any]:
+    """
+    Bulk-load the union of the option legs every combination can touch, so the
+    archive is read once per sweep instead of once per combination in each worker
+    """
+    requests = {}
+    with contextlib.redirect_stdout(io.StringIO()):
+        for params in combinations:
+            config = _combination_config(params, shared_data)
+            plan_option_legs, _ = simulation_for(config)
+            entries_df = _entries_for(config, shared_data)
+            for request in plan_option_legs(entries_df, shared_data['expiry_dates'], config,
+                                            shared_data['create_symbol_format_fn']):
+                requests[request] = None
+    frames = shared_data['bulk_fetch_fn'](list(requests)) if requests else {}
+    print(f"--- Prefetched {len(frames)}/{len(requests)} option legs for {len(combinations)} combinations ---")
+    return frames
+
+
+def run_combination(params: Dict[str, Any], shared_data: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Signals -> entries -> simulation -> metrics for one parameter set"""
+    data = shared_data or _shared
+    config = _combination_config(params, data)
+
+    # The simulation logs every entry; keep worker output quiet
+    with contextlib.redirect_stdout(io.StringIO()):
+        entries_df = _entries_for(config, data)
+        _, simulate_trades = simulation_for(config)
+        fetch_option_data_fn = data['fetch_option_data_fn']
+        if data.get('option_frames') is not None:
+            fetch_option_data_fn = PrefetchedLegs(data['option_frames'], fetch_option_data_fn)
+        trades_df = simulate_trades(
+            entries_df,
+            data['df_1min'],
+            data['expiry_dates'],
+            fetch_option_data_fn=fetch_option_data_fn,
+            create_symbol_format_fn=data['create_symbol_format_fn'],
+            config=config
+        )
+        metrics = backtest_metrics(
+            trades_df, trading_days=data['df_1min']['date'].dt.normalize().unique(), include_trades=False
+        )
+
+    metrics.pop('trades', None)
+    return {'params': params, **metrics}
+
+
+def iter_sweep(param_grid: Dict[str, List[Any]], shared_data: Dict[str, Any],
+               max_workers: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+    """Yield each combination's metrics as soon as a worker finishes it"""
+    combinations = expand_grid(param_grid)
+    max_workers = max_workers or os.cpu_count() or 1
+    if shared_data.get('bulk_fetch_fn') and shared_data.get('option_frames') is None:
+        # Workers receive the frames once through the pool initializer
+        shared_data = {**shared_data, 'option_frames': prefetch_sweep_legs(combinations, shared_data)}
+
+    if max_workers == 1:
+        for params in combinations:
+            yield run_combination(params, shared_data)
+        return
+
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker, initargs=(shared_data,)) as pool:
+        futures = {pool.submit(run_combination, params): params for params in combinations}
+        for future in as_completed(futures):
+            try:
+                yield future.result()
+            except Exception as e:
+                yield {'params': futures[future], 'success': False, 'error': str(e)}
+
+
+def _rank_value(result: Dict[str, Any], rank_by: str) -> float:
+    """Failed combinations and missing metrics sort last"""
+    value = result.get(rank_by) if result.get('success') else None
+    return float('-inf') if value is None else value
+
+
+def run_sweep(param_grid: Dict[str, List[Any]], shared_data: Dict[str, Any],
+              rank_by: str = 'total_pnl', max_workers: Optional[int] = None,
+              progress_callback: Optional[Callable[[Dict[str, Any], List[Dict[str, Any]]], None]] = None) -> List[Dict[str, Any]]:
+    """
+    Run every combination of param_grid across a process pool and return results
+    ranked by `rank_by` (descending). progress_callback(result, ranked_so_far) is
+    called as each combination completes, so callers can stream the leaderboard.
+    """
+    ranked = []
+    for result in iter_sweep(param_grid, shared_data, max_workers):
+        ranked.append(result)
+        ranked.sort(key=lambda r: _rank_value(r, rank_by), reverse=True)
+        if progress_callback:
+            progress_callback(result, ranked)
+    return ranked
@@ -7,6 +7,11 @@ from routers import auth, strategies, dashboard, backtest, option_data, bull_cre
 # Create database tables
 Base.metadata.create_all(bind=engine)
 
+# create_all skips indexes added to tables that already exist
+for table in Base.metadata.sorted_tables:
+    for index in table.indexes:
+        index.create(bind=engine, checkfirst=True)
+
 # FastAPI app initialization
 app = FastAPI(title=settings.API_TITLE, version=settings.API_VERSION)
 
@@ -17,6 +22,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Next-Cursor"],
 )
 
 # Include routers
@@ -1,9 +1,14 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, Text
+from sqlalchemy import Column, Integer, String, Float, DateTime, Text, Index, LargeBinary
+from sqlalchemy.orm import deferred
 from datetime import datetime
 from config.database import Base
 
 class BacktestResult(Base):
     __tablename__ = "backtest_results"
+    __table_args__ = (
+        # Per-user listings and dashboard queries, newest first
+        Index("ix_backtest_results_user_created", "user_id", "created_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, nullable=False)
@@ -15,5 +20,36 @@ class BacktestResult(Base):
     total_pnl = Column(Float)
     max_drawdown = Column(Float)
     sharpe_ratio = Column(Float)
-    results_data = Column(Text)  # JSON string of detailed results
+    results_data = deferred(Column(Text))  # JSON string of detailed results, loaded only when accessed
     created_at = Column(DateTime, default=datetime.utcnow)
+
+class BacktestCache(Base):
+    __tablename__ = "backtest_cache"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    cache_key = Column(String, unique=True, index=True, nullable=False)  # sha256 of engine version + config + dates + data version
+    config_hash = Column(String, nullable=False)
+    start_date = Column(String, nullable=False)
+    end_date = Column(String, nullable=False)
+    data_version = Column(String, nullable=False)
+    results_data = Column(Text)  # JSON string of the run_backtest output
+    hits = Column(Integer, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    last_used_at = Column(DateTime, default=datetime.utcnow)
+
+class TradeBlob(Base):
+    __tablename__ = "backtest_trade_blobs"
+    
+    digest = Column(String, primary_key=True)  # sha256 of the encoded log; results_data refers to it as trades_ref
+    trade_count = Column(Integer, nullable=False)
+    columns = Column(Text)  # JSON list of column names
+    data = deferred(Column(LargeBinary))  # whole log as zstd Parquet; only logs stored before TradeChunk
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+class TradeChunk(Base):
+    __tablename__ = "backtest_trade_chunks"
+    
+    digest = Column(String, primary_key=True)  # TradeBlob.digest of the log
+    first_row = Column(Integer, primary_key=True)
+    row_count = Column(Integer, nullable=False)
+    data = Column(LargeBinary, nullable=False)  # rows [first_row, first_row + row_count) as zstd Parquet
@@ -1,14 +1,21 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from pymongo.database import Database
-from typing import List
+from typing import List, Optional
+from datetime import date
 from config.database import get_db, get_mongo_db
-from schemas.backtest import BacktestRequest, BacktestExecuteRequest, BacktestResultResponse
+from schemas.backtest import BacktestRequest, BacktestExecuteRequest, BacktestResultResponse, BacktestJobResponse, SweepRequest
 from services.backtest_service import BacktestService
+from services.backtest_runner import backtest_runner
+from services.job_service import backtest_jobs
+from engine.config import DEFAULT_CONFIG
 from services.strategy_service import StrategyService
+from services.trade_store import trade_store, trade_records, encode_trades
 from utils.dependencies import get_current_user
 from models.user import User
 import json
+import pandas as pd
 
 router = APIRouter(prefix="/api/backtest", tags=["Backtest"])
 
@@ -21,25 +28,72 @@ def get_strategy_service(mongo_db: Database = Depends(get_mongo_db)) -> Strategy
 
 @router.get("/results", response_model=List[BacktestResultResponse])
 async def get_backtest_results(
+    response: Response,
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = None,
+    strategy_id: Optional[str] = None,
+    created_from: Optional[date] = None,
+    created_to: Optional[date] = None,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
     backtest_service: BacktestService = Depends(get_backtest_service)
 ):
-    """Get all backtest results for the current user"""
-    return backtest_service.get_backtest_results(db, current_user)
+    """
+    Get backtest results for the current user, newest first, one page at a time.
+    When more results follow, the X-Next-Cursor header holds the `cursor` for the next page.
+    """
+    try:
+        results, next_cursor = backtest_service.get_backtest_results(
+            db, current_user, limit, cursor, strategy_id, created_from, created_to
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return results
+
+def _split_columns(columns: Optional[str]) -> Optional[List[str]]:
+    return [column.strip() for column in columns.split(",") if column.strip()] if columns else None
+
+def _trade_page(db: Session, results_data: dict, offset: int, limit: Optional[int], columns: Optional[List[str]]) -> List[dict]:
+    """One page of a result's trades, from the trade store or (older results) inline in results_data"""
+    if "trades_ref" not in results_data:
+        trades = results_data.get("trades") or []
+        stop = None if limit is None else offset + limit
+        return [{key: value for key, value in trade.items() if not columns or key in columns}
+                for trade in trades[offset:stop]]
+    if not results_data["trades_ref"]:
+        return []
+    trades = trade_store.load(db, results_data["trades_ref"], columns, offset, limit)
+    if trades is None:
+        raise HTTPException(status_code=404, detail="Trade log not found")
+    return trade_records(trades)
 
 @router.get("/results/{result_id}")
 async def get_backtest_result_detail(
     result_id: int,
+    trades_offset: int = Query(0, ge=0),
+    trades_limit: int = Query(100, ge=0, le=5000),
+    trade_columns: Optional[str] = Query(None, description="Comma-separated trade fields to include"),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
     backtest_service: BacktestService = Depends(get_backtest_service)
 ):
-    """Get detailed backtest result by ID"""
+    """
+    Get detailed backtest result by ID. results_data.trades holds trades
+    [trades_offset, trades_offset + trades_limit); results_data.trade_count is the full count.
+    """
     result = backtest_service.get_backtest_result_detail(db, result_id, current_user)
     if not result:
         raise HTTPException(status_code=404, detail="Backtest result not found")
     
+    results_data = json.loads(result.results_data) if result.results_data else None
+    if results_data is not None:
+        results_data["trades"] = _trade_page(db, results_data, trades_offset, trades_limit,
+                                             _split_columns(trade_columns))
+        results_data.setdefault("trade_count", result.total_trades)
+    
     return {
         "id": result.id,
         "strategy_id": result.strategy_id,
@@ -50,43 +104,142 @@ async def get_backtest_result_detail(
         "total_pnl": result.total_pnl,
         "max_drawdown": result.max_drawdown,
         "sharpe_ratio": result.sharpe_ratio,
-        "results_data": json.loads(result.results_data) if result.results_data else None,
+        "results_data": results_data,
         "created_at": result.created_at
     }
 
-@router.post("/execute")
+@router.get("/results/{result_id}/trades")
+async def get_backtest_result_trades(
+    result_id: int,
+    offset: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=0),
+    columns: Optional[str] = Query(None, description="Comma-separated trade fields to include"),
+    format: str = "json",
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+    backtest_service: BacktestService = Depends(get_backtest_service)
+):
+    """
+    Trades of a backtest result. With format=parquet the stored zstd Parquet log is
+    returned as-is (or re-encoded when offset/limit/columns select part of it).
+    """
+    result = backtest_service.get_backtest_result_detail(db, result_id, current_user)
+    if not result:
+        raise HTTPException(status_code=404, detail="Backtest result not found")
+    
+    results_data = json.loads(result.results_data) if result.results_data else {}
+    column_list = _split_columns(columns)
+    if format == "json":
+        return {
+            "trades": _trade_page(db, results_data, offset, limit, column_list),
+            "trade_count": results_data.get("trade_count", result.total_trades),
+            "offset": offset
+        }
+    
+    if format != "parquet":
+        raise HTTPException(status_code=400, detail="format must be one of json, parquet")
+    
+    digest = results_data.get("trades_ref")
+    if digest and not offset and limit is None and not column_list:
+        data = trade_store.raw(db, digest)
+        if data is None:
+            raise HTTPException(status_code=404, detail="Trade log not found")
+    else:
+        data = encode_trades(pd.DataFrame(_trade_page(db, results_data, offset, limit, column_list)))
+    return Response(content=data, media_type="application/vnd.apache.parquet",
+                    headers={"Content-Disposition": f'attachment; filename="backtest_{result_id}_trades.parquet"'})
+
+@router.post("/execute", response_model=BacktestJobResponse, status_code=202)
 async def execute_backtest(
     backtest_request: BacktestExecuteRequest,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user)
 ):
-    """Execute a backtest with given strategy and parameters (placeholder)"""
-    # For now, just return a placeholder response
-    # This will be implemented when backtest_service is ready
-    return {
-        "success": False,
-        "message": "Backtest execution not yet implemented",
-        "strategy_name": backtest_request.name
-    }
+    """Queue a backtest with the given config; follow it via /jobs/{job_id}/events"""
+    job = backtest_jobs.submit(
+        current_user,
+        backtest_request.config,
+        backtest_request.start_date,
+        backtest_request.end_date,
+        name=backtest_request.name
+    )
+    return job.to_dict()
 
-@router.post("/run/{strategy_id}")
+@router.post("/run/{strategy_id}", response_model=BacktestJobResponse, status_code=202)
 async def run_backtest_for_strategy(
     strategy_id: str,
     backtest_request: BacktestRequest,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
     strategy_service: StrategyService = Depends(get_strategy_service)
 ):
-    """Run backtest for an existing strategy (placeholder)"""
-    # Get the strategy to validate it exists
+    """Queue a backtest for an existing strategy; follow it via /jobs/{job_id}/events"""
     strategy = strategy_service.get_strategy(strategy_id, current_user)
     if not strategy:
         raise HTTPException(status_code=404, detail="Strategy not found")
     
-    # For now, just return a placeholder response
-    return {
-        "success": False,
-        "message": "Backtest execution not yet implemented",
-        "strategy_id": strategy_id,
-        "strategy_name": strategy.name
-    }
+    job = backtest_jobs.submit(
+        current_user,
+        backtest_runner.config_from_strategy(strategy.config),
+        backtest_request.start_date,
+        backtest_request.end_date,
+        strategy_id=strategy_id,
+        name=strategy.name
+    )
+    return job.to_dict()
+
+@router.post("/sweep", response_model=BacktestJobResponse, status_code=202)
+async def sweep_backtest(
+    sweep_request: SweepRequest,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Queue a parameter sweep: every combination of param_grid over config. Follow it via
+    /jobs/{job_id}/events; /jobs/{job_id} holds the leaderboard, updated as combinations finish.
+    """
+    unknown = [key for key in sweep_request.param_grid if key not in DEFAULT_CONFIG]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown sweep parameters: {', '.join(unknown)}")
+    if not sweep_request.param_grid or not all(sweep_request.param_grid.values()):
+        raise HTTPException(status_code=400, detail="param_grid needs at least one value per parameter")
+    
+    job = backtest_jobs.submit_sweep(
+        current_user,
+        sweep_request.config,
+        sweep_request.param_grid,
+        sweep_request.start_date,
+        sweep_request.end_date,
+        rank_by=sweep_request.rank_by,
+        name=sweep_request.name
+    )
+    return job.to_dict()
+
+@router.get("/jobs", response_model=List[BacktestJobResponse])
+async def list_backtest_jobs(current_user: User = Depends(get_current_user)):
+    """Queued, running and recently finished backtest jobs of the current user"""
+    return [job.to_dict() for job in backtest_jobs.list_jobs(current_user.id)]
+
+@router.get("/jobs/{job_id}", response_model=BacktestJobResponse)
+async def get_backtest_job(job_id: str, current_user: User = Depends(get_current_user)):
+    """Current status and progress of a backtest job"""
+    job = backtest_jobs.get(job_id, current_user.id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Backtest job not found")
+    return job.to_dict()
+
+@router.get("/jobs/{job_id}/events")
+async def stream_backtest_job(job_id: str, current_user: User = Depends(get_current_user)):
+    """Server-sent progress events of a backtest job, ending with a completed/failed/cancelled event"""
+    job = backtest_jobs.get(job_id, current_user.id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Backtest job not found")
+    return StreamingResponse(
+        backtest_jobs.stream(job),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.delete("/jobs/{job_id}")
+async def cancel_backtest_job(job_id: str, current_user: User = Depends(get_current_user)):
+    """Cancel a backtest job that is still queued"""
+    if not backtest_jobs.cancel(job_id, current_user.id):
+        raise HTTPException(status_code=409, detail="Job not found or already started")
+    return {"success": True, "job_id": job_id}
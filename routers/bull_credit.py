@@ -1,7 +1,7 @@
-from fastapi import APIRouter, HTTPException
-from typing import List, Dict
-import pandas as pd
+from fastapi import APIRouter, HTTPException, Query
+from typing import Dict, Optional
 from pathlib import Path
+from services.bull_credit_service import BullCreditStore
 
 router = APIRouter(
     prefix="/api/bull-credit",
@@ -10,23 +10,48 @@ router = APIRouter(
 
 CSV_FILE_PATH = Path("files/bull_credit.csv")
 
+bull_credit_store = BullCreditStore(CSV_FILE_PATH)
+
 @router.get("/data")
-async def get_bull_credit_data() -> Dict:
+async def get_bull_credit_data(
+    entry_month: Optional[str] = None,
+    exit_reason: Optional[str] = None,
+    expiry: Optional[str] = None,
+    indicator: Optional[str] = None,
+    sort_by: Optional[str] = None,
+    sort_order: str = "asc",
+    page: Optional[int] = None,
+    page_size: int = Query(100, ge=1, le=10000)
+) -> Dict:
+    """
+    Get data from the bull_credit.csv file.
+    
+    Filters take one value or a comma-separated list; sort_by is any column and
+    sort_order asc/desc. Without `page` every matching row is returned.
+    """
+    try:
+        result = bull_credit_store.query(
+            {"entry_month": entry_month, "exit_reason": exit_reason, "expiry": expiry, "indicator": indicator},
+            sort_by=sort_by,
+            sort_order=sort_order,
+            page=page,
+            page_size=page_size
+        )
+        return {"success": True, **result}
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Bull credit CSV file not found")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error reading bull credit data: {str(e)}")
+
+@router.get("/filters")
+async def get_bull_credit_filters() -> Dict:
     """
-    Get all data from the bull_credit.csv file
+    Distinct values of each filterable column
     """
     try:
-        # Read the CSV file
-        df = pd.read_csv(CSV_FILE_PATH)
-        
-        # Convert DataFrame to list of dictionaries
-        data = df.to_dict(orient="records")
-        
-        return {
-            "success": True,
-            "data": data,
-            "total_records": len(data)
-        }
+        return bull_credit_store.filter_values()
     except FileNotFoundError:
         raise HTTPException(status_code=404, detail="Bull credit CSV file not found")
     except Exception as e:
@@ -38,28 +63,9 @@ async def get_bull_credit_summary() -> Dict:
     Get summary statistics of the bull_credit.csv file
     """
     try:
-        # Read the CSV file
-        df = pd.read_csv(CSV_FILE_PATH)
-        
-        # Calculate basic statistics
-        summary = {
-            "total_records": len(df),
-            "columns": df.columns.tolist(),
-            "numeric_stats": {}
-        }
-        
-        # Calculate statistics for numeric columns
-        numeric_columns = df.select_dtypes(include=['int64', 'float64']).columns
-        for col in numeric_columns:
-            summary["numeric_stats"][col] = {
-                "min": float(df[col].min()),
-                "max": float(df[col].max()),
-                "mean": float(df[col].mean()),
-                "median": float(df[col].median())
-            }
-            
-        return summary
+        # Computed once per file version
+        return bull_credit_store.summary()
     except FileNotFoundError:
         raise HTTPException(status_code=404, detail="Bull credit CSV file not found")
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error generating summary: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Error generating summary: {str(e)}")
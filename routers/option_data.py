@@ -1,9 +1,14 @@
-from fastapi import APIRouter, HTTPException
-from typing import List, Dict
-import os
-from datetime import datetime
+import re
+from fastapi import APIRouter, HTTPException, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
+from typing import List, Dict, Optional
 import pandas as pd
 from pathlib import Path
+from config.settings import settings
+from engine.catalog import data_catalog
+from services.option_data_service import (
+    OptionDataService, DEFAULT_BATCH_SIZE, SYMBOL_COLUMN, STRIKE_COLUMN, OPTION_TYPE_COLUMN
+)
 
 router = APIRouter(
     prefix="/api/option-data",
@@ -11,71 +16,101 @@ router = APIRouter(
 )
 
 # Base directory for option data
-OPTION_DATA_DIR = Path("../Option-Data")
+OPTION_DATA_DIR = Path(settings.OPTION_DATA_DIR)
+
+option_data_service = OptionDataService(OPTION_DATA_DIR)
+
+_ENTITY_TAG = re.compile(r'(?:W/)?"([^"]*)"')
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    If-None-Match evaluation per RFC 9110: "*" or any listed entity-tag that
+    weakly matches (W/ prefixes ignored) the current opaque etag value.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return etag in _ENTITY_TAG.findall(if_none_match)
 
 @router.get("/available-dates")
-async def get_available_dates() -> Dict[str, List[str]]:
+async def get_available_dates(request: Request):
     """
     Get all available dates for which option data exists.
     Returns a dictionary with years as keys and lists of dates as values.
+    
+    Served from the in-memory catalog with an ETag; an If-None-Match that matches it gets 304.
     """
     try:
-        available_dates = {}
+        available_dates, etag = data_catalog.available_dates()
+        headers = {"ETag": f'"{etag}"', "Cache-Control": "no-cache"}
         
-        # Walk through the Option-Data directory
-        for year in os.listdir(OPTION_DATA_DIR):
-            year_path = OPTION_DATA_DIR / year
-            if not year_path.is_dir():
-                continue
-                
-            available_dates[year] = []
-            for month in os.listdir(year_path):
-                month_path = year_path / month
-                if not month_path.is_dir():
-                    continue
-                    
-                for date_folder in os.listdir(month_path):
-                    if date_folder.startswith("GFDLNFO_TICK_OPTIONS_"):
-                        # Extract date from folder name (e.g., GFDLNFO_TICK_OPTIONS_01082023)
-                        date_str = date_folder.split("_")[-1]
-                        formatted_date = datetime.strptime(date_str, "%d%m%Y").strftime("%Y-%m-%d")
-                        available_dates[year].append(formatted_date)
-                        
-            # Sort dates within each year
-            available_dates[year].sort()
-            
-        return available_dates
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers=headers)
+        
+        return JSONResponse(content=available_dates, headers=headers)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching available dates: {str(e)}")
 
+@router.get("/coverage")
+async def get_data_coverage(start_date: str, end_date: str) -> Dict:
+    """
+    Trading days between start_date and end_date (YYYY-MM-DD) and which of them
+    have no option data, answered from the catalog without scanning folders.
+    """
+    try:
+        return {
+            "start_date": start_date,
+            "end_date": end_date,
+            **data_catalog.coverage(start_date, end_date),
+            "expiry_dates": data_catalog.expiry_dates(start_date, end_date)
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error computing coverage: {str(e)}")
+
 @router.get("/data/{date}")
-async def get_option_data(date: str) -> Dict:
+async def get_option_data(
+    date: str,
+    format: str = "json",
+    symbol: Optional[str] = None,
+    strike: Optional[float] = None,
+    option_type: Optional[str] = None,
+    columns: Optional[str] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE
+):
     """
     Get option data for a specific date.
     Date should be in YYYY-MM-DD format.
+    
+    format=json returns the whole day in one response; format=ndjson (one row per line)
+    and format=arrow (Arrow IPC stream) are streamed file by file with bounded memory.
+    symbol / strike / option_type filter rows and columns (comma-separated) projects them.
     """
     try:
-        # Convert date to the format used in folder names
-        date_obj = datetime.strptime(date, "%Y-%m-%d")
-        folder_date = date_obj.strftime("%d%m%Y")
-        year = date_obj.strftime("%Y")
-        month = date_obj.strftime("%b").upper()
-        
-        # Construct path to the data folder
-        data_path = OPTION_DATA_DIR / year / month / f"GFDLNFO_TICK_OPTIONS_{folder_date}"
+        # Validates the date format as well
+        data_path = option_data_service.day_path(date)
         
         if not data_path.exists():
             raise HTTPException(status_code=404, detail=f"No data found for date {date}")
-            
+        
+        filters = {SYMBOL_COLUMN: symbol, STRIKE_COLUMN: strike, OPTION_TYPE_COLUMN: option_type}
+        column_list = [column.strip() for column in columns.split(",") if column.strip()] if columns else None
+        
+        if format == "ndjson":
+            return StreamingResponse(
+                option_data_service.stream_ndjson(date, filters, column_list, batch_size),
+                media_type="application/x-ndjson"
+            )
+        if format == "arrow":
+            return StreamingResponse(
+                option_data_service.stream_arrow(date, filters, column_list, batch_size),
+                media_type="application/vnd.apache.arrow.stream"
+            )
+        if format != "json":
+            raise HTTPException(status_code=400, detail="format must be one of json, ndjson, arrow")
+        
         # Read all CSV files in the folder and combine them
-        all_data = []
-        for file in data_path.glob("*.csv"):
-            try:
-                df = pd.read_csv(file)
-                all_data.append(df)
-            except Exception as e:
-                print(f"Error reading file {file}: {str(e)}")
-                continue
+        all_data = list(option_data_service.iter_frames(date, filters, column_list, batch_size))
                 
         if not all_data:
             raise HTTPException(status_code=404, detail=f"No valid data found for date {date}")
@@ -100,26 +135,31 @@ async def get_option_data_summary(date: str) -> Dict:
     """
     Get a summary of option data for a specific date.
     Includes basic statistics and overview of available data.
+    
+    Served from the day's metadata sidecar, written by the ingest step
+    (python -m services.option_data_service) after new data is copied in; tick
+    rows are not read and nothing is written.
     """
     try:
-        data = await get_option_data(date)
-        if not data["data"]:
+        if not option_data_service.day_path(date).exists():
+            raise HTTPException(status_code=404, detail=f"No data found for date {date}")
+        
+        metadata = option_data_service.day_metadata(date)
+        if not metadata["total_records"]:
             return {
                 "date": date,
                 "total_records": 0,
                 "status": "No data available"
             }
-            
-        df = pd.DataFrame(data["data"])
         
         return {
             "date": date,
-            "total_records": len(df),
-            "symbols": df["Symbol"].unique().tolist() if "Symbol" in df.columns else [],
-            "strike_prices": sorted(df["Strike_Price"].unique().tolist()) if "Strike_Price" in df.columns else [],
-            "option_types": df["Option_Type"].unique().tolist() if "Option_Type" in df.columns else []
+            "total_records": metadata["total_records"],
+            "symbols": metadata["symbols"],
+            "strike_prices": metadata["strike_prices"],
+            "option_types": metadata["option_types"]
         }
     except HTTPException:
         raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error generating summary: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Error generating summary: {str(e)}")
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional, List
+from typing import Optional, List, Dict, Any
 from datetime import datetime
 
 class BacktestRequest(BaseModel):
@@ -14,6 +14,14 @@ class BacktestExecuteRequest(BaseModel):
     start_date: str  # YYYY-MM-DD format
     end_date: str    # YYYY-MM-DD format
 
+class SweepRequest(BaseModel):
+    name: Optional[str] = None
+    config: dict  # base config; param_grid values override it per combination
+    param_grid: Dict[str, List[Any]]  # e.g. {"spread": [150, 200], "max_hold": [60, 120]}
+    start_date: str  # YYYY-MM-DD format
+    end_date: str    # YYYY-MM-DD format
+    rank_by: str = "total_pnl"
+
 class BacktestResultResponse(BaseModel):
     id: int
     strategy_id: str  # MongoDB ObjectId as string
@@ -26,6 +34,23 @@ class BacktestResultResponse(BaseModel):
     sharpe_ratio: float
     created_at: datetime
 
+class BacktestJobResponse(BaseModel):
+    job_id: str
+    status: str  # queued, running, completed, failed or cancelled
+    stage: str
+    progress: int
+    strategy_id: str
+    name: Optional[str] = None
+    start_date: str
+    end_date: str
+    result_id: Optional[int] = None
+    cached: bool = False  # served from the result cache
+    leaderboard: Optional[List[dict]] = None  # sweep jobs: results ranked by rank_by, best first
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
 class DashboardStats(BaseModel):
     total_strategies: int
     total_backtests: int
@@ -0,0 +1,245 @@
+import pandas as pd
+import traceback
+from typing import Dict, Any, List
+from engine.market_data import candle_data_version, fetch_max_data_zerodha
+from engine.indicators import generate_signals
+from engine.entries import match_signals_with_1min
+from engine.resample import resample_candles
+from engine.simulation import load_expiry_dates_from_csv
+from engine.multileg import simulation_for
+from engine.prefetch import prefetch_option_legs
+from engine.metrics import backtest_metrics
+from engine.config import DEFAULT_CONFIG, validate_config
+from engine.option_source import fetch_option_data, fetch_many_option_data
+from zip_read import create_symbol_format
+
+
+class BacktestRunner:
+    """Service class to handle backtest execution"""
+    
+    def __init__(self):
+        self.default_config = dict(DEFAULT_CONFIG)
+    
+    def validate_config(self, config: Dict[str, Any]) -> Dict[str, Any]:
+        """Validate and merge config with defaults"""
+        return validate_config(config, self.default_config)
+    
+    def config_from_strategy(self, strategy_config) -> Dict[str, Any]:
+        """Map a saved StrategyConfig onto the runner's config keys (unset fields keep the defaults)"""
+        config = {}
+        if strategy_config.timeFrame:
+            config['timeframe'] = strategy_config.timeFrame
+        if strategy_config.totalStopLoss:
+            config['total_stop_loss'] = strategy_config.totalStopLoss
+        if strategy_config.trailingSL:
+            config['trailing_sl'] = strategy_config.trailingSL
+        if strategy_config.timeExit:
+            config['max_hold'] = strategy_config.timeExit
+        if strategy_config.filters:
+            config['filters'] = [condition.dict() for condition in strategy_config.filters]
+        if strategy_config.legs:
+            config['legs'] = [leg.dict() for leg in strategy_config.legs]
+        if strategy_config.totalTarget:
+            config['total_target'] = strategy_config.totalTarget
+        if strategy_config.noReentryAfter:
+            config['no_reentry_after'] = strategy_config.noReentryAfter
+        if strategy_config.legwiseExit:
+            config['legwise_exit'] = True
+        if strategy_config.legwiseSquareoff:
+            config['legwise_squareoff'] = strategy_config.legwiseSquareoff
+        if strategy_config.overlapEntryAllowed:
+            config['overlap_entry_allowed'] = True
+        return config
+    
+    def run_backtest(
+        self, 
+        strategy_config: Dict[str, Any], 
+        start_date: str, 
+        end_date: str,
+        progress_callback=None
+    ) -> Dict[str, Any]:
+        """
+        Run backtest with given parameters
+        
+        Args:
+            strategy_config: Strategy configuration parameters
+            start_date: Start date in YYYY-MM-DD format
+            end_date: End date in YYYY-MM-DD format
+            progress_callback: Optional callback function for progress updates
+            
+        Returns:
+            Dictionary containing backtest results
+        """
+        try:
+            # Validate configuration
+            config = self.validate_config(strategy_config)
+            
+            if progress_callback:
+                progress_callback("Validating configuration", 10)
+            
+            # Load expiry dates
+            expiry_dates = load_expiry_dates_from_csv('files/expiry_dates.csv', start_date, end_date)
+            
+            if progress_callback:
+                progress_callback("Loading historical data", 20)
+            
+            # Fetch 1-minute data once and derive the signal timeframe from it
+            historical_data_1min = fetch_max_data_zerodha(
+                config['instrument_token'], 
+                start_date, 
+                end_date, 
+                'minute'
+            )
+            
+            historical_data_min_interval = resample_candles(historical_data_1min, config['timeframe'])
+            
+            if progress_callback:
+                progress_callback("Generating signals", 40)
+            
+            # Generate signals; indicator series are reused while the stored candles are unchanged
+            data_version = candle_data_version(config['instrument_token'], start_date, end_date, 'minute')
+            df_signals = generate_signals(historical_data_min_interval, config, data_version=data_version)
+            
+            if progress_callback:
+                progress_callback("Matching signals with 1min data", 60)
+            
+            # Match signals with 1min data
+            entries_df = match_signals_with_1min(df_signals)
+            
+            if progress_callback:
+                progress_callback("Loading option data", 70)
+            
+            # Two-leg bull put spread, or the generic engine when the strategy defines legs
+            plan_option_legs, simulate_trades = simulation_for(config)
+            
+            # Load every option leg the entries can touch in one pass over the tick store / archive
+            prefetched_legs = prefetch_option_legs(
+                entries_df,
+                expiry_dates,
+                config,
+                create_symbol_format_fn=create_symbol_format,
+                bulk_fetch_fn=fetch_many_option_data,
+                fallback_fn=fetch_option_data,
+                plan_fn=plan_option_legs
+            )
+            
+            if progress_callback:
+                progress_callback("Running trade simulation", 80)
+            
+            # Simulate trades
+            trades_df = simulate_trades(
+                entries_df,
+                historical_data_1min,
+                expiry_dates,
+                fetch_option_data_fn=prefetched_legs,
+                create_symbol_format_fn=create_symbol_format,
+                config=config
+            )
+            
+            if progress_callback:
+                progress_callback("Calculating results", 95)
+            
+            # Calculate results
+            results = self.calculate_backtest_metrics(
+                trades_df, config, trading_days=historical_data_1min['date'].dt.normalize().unique()
+            )
+            
+            if progress_callback:
+                progress_callback("Complete", 100)
+            
+            return results
+            
+        except Exception as e:
+            error_msg = f"Backtest execution failed: {str(e)}"
+            traceback.print_exc()
+            return {
+                'success': False,
+                'error': error_msg,
+                'total_trades': 0,
+                'winning_trades': 0,
+                'losing_trades': 0,
+                'win_rate': 0.0,
+                'total_pnl': 0.0,
+                'max_drawdown': 0.0,
+                'sharpe_ratio': 0.0,
+                'trades': []
+            }
+    
+    def calculate_backtest_metrics(self, trades_df: pd.DataFrame, config: Dict[str, Any],
+                                   trading_days=None, include_trades: bool = True) -> Dict[str, Any]:
+        """
+        Calculate backtest performance metrics (see engine.metrics). trading_days is the
+        session calendar of the window, used for the daily equity curve.
+        """
+        return backtest_metrics(trades_df, trading_days, include_trades)
+    
+    def get_default_strategy_templates(self) -> List[Dict[str, Any]]:
+        """Get predefined strategy templates"""
+        templates = [
+            {
+                'name': 'Conservative Bull Credit Spread',
+                'description': 'Conservative bull credit spread with tight stop loss',
+                'config': {
+                    'ema9': 9,
+                    'ema21': 21,
+                    'sma200': 200,
+                    'rsi14': 14,
+                    'rsi_threshold': 55,
+                    'body_ratio': 0.7,
+                    'sell_otm': 50,
+                    'spread': 150,
+                    'lot_size': 25,
+                    'max_profit_per_lot': 75,
+                    'spot_sl_pct': 0.002,
+                    'max_hold': 120,
+                    'min_premium': 25,
+                    'timeframe': '15minute'
+                }
+            },
+            {
+                'name': 'Aggressive Bull Credit Spread',
+                'description': 'Aggressive strategy with wider spreads and higher risk',
+                'config': {
+                    'ema9': 9,
+                    'ema21': 21,
+                    'sma200': 200,
+                    'rsi14': 14,
+                    'rsi_threshold': 45,
+                    'body_ratio': 0.5,
+                    'sell_otm': 0,
+                    'spread': 250,
+                    'lot_size': 75,
+                    'max_profit_per_lot': 150,
+                    'spot_sl_pct': 0.005,
+                    'max_hold': 300,
+                    'min_premium': 35,
+                    'timeframe': '15minute'
+                }
+            },
+            {
+                'name': 'Intraday Scalping',
+                'description': 'Quick intraday trades with tight parameters',
+                'config': {
+                    'ema9': 5,
+                    'ema21': 13,
+                    'sma200': 100,
+                    'rsi14': 14,
+                    'rsi_threshold': 60,
+                    'body_ratio': 0.8,
+                    'sell_otm': 25,
+                    'spread': 100,
+                    'lot_size': 50,
+                    'max_profit_per_lot': 50,
+                    'spot_sl_pct': 0.001,
+                    'max_hold': 60,
+                    'min_premium': 20,
+                    'timeframe': '5minute'
+                }
+            }
+        ]
+        
+        return templates
+
+
+# Global runner instance
+backtest_runner = BacktestRunner()
@@ -1,5 +1,8 @@
+import base64
+from datetime import date, datetime, time, timedelta
+from sqlalchemy import func, or_, and_
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional, Tuple
 from models.backtest import BacktestResult
 from models.user import User
 from schemas.backtest import DashboardStats
@@ -15,53 +18,84 @@ class BacktestService:
         # Get total strategies from MongoDB
         total_strategies = self.strategy_service.count_user_strategies(user)
         
-        # Get backtest results from SQLite
-        backtest_results = db.query(BacktestResult).filter(BacktestResult.user_id == user.id).all()
-        total_backtests = len(backtest_results)
+        # Aggregate backtest results in SQLite; results_data is deferred and never loaded here
+        user_results = db.query(BacktestResult).filter(BacktestResult.user_id == user.id)
+        total_backtests, avg_win_rate, total_pnl = db.query(
+            func.count(BacktestResult.id),
+            func.avg(BacktestResult.win_rate),
+            func.sum(BacktestResult.total_pnl)
+        ).filter(BacktestResult.user_id == user.id).one()
         
-        # Calculate statistics
-        if backtest_results:
-            avg_win_rate = sum(result.win_rate for result in backtest_results) / len(backtest_results)
-            total_pnl = sum(result.total_pnl for result in backtest_results)
+        if total_backtests:
+            best_result = user_results.order_by(BacktestResult.total_pnl.desc(), BacktestResult.id).first()
+            recent = user_results.order_by(BacktestResult.created_at.desc(), BacktestResult.id).limit(5).all()
+            
+            # One Mongo round trip for every strategy name shown
+            strategy_names = self.strategy_service.get_strategy_names(
+                [best_result.strategy_id] + [result.strategy_id for result in recent], user
+            )
             
-            # Find best strategy
-            best_result = max(backtest_results, key=lambda x: x.total_pnl)
-            best_strategy_data = self.strategy_service.get_strategy(best_result.strategy_id, user)
             best_strategy = {
-                "name": best_strategy_data.name,
+                "name": strategy_names[best_result.strategy_id],
                 "pnl": best_result.total_pnl,
                 "win_rate": best_result.win_rate
-            } if best_strategy_data else None
+            } if best_result.strategy_id in strategy_names else None
             
-            # Recent results
-            recent_results = []
-            for result in sorted(backtest_results, key=lambda x: x.created_at, reverse=True)[:5]:
-                strategy_data = self.strategy_service.get_strategy(result.strategy_id, user)
-                recent_results.append({
-                    "id": result.id,
-                    "strategy_name": strategy_data.name if strategy_data else "Unknown Strategy",
-                    "total_pnl": result.total_pnl,
-                    "win_rate": result.win_rate,
-                    "created_at": result.created_at
-                })
+            recent_results = [{
+                "id": result.id,
+                "strategy_name": strategy_names.get(result.strategy_id, "Unknown Strategy"),
+                "total_pnl": result.total_pnl,
+                "win_rate": result.win_rate,
+                "created_at": result.created_at
+            } for result in recent]
         else:
-            avg_win_rate = 0.0
-            total_pnl = 0.0
             best_strategy = None
             recent_results = []
         
         return DashboardStats(
             total_strategies=total_strategies,
             total_backtests=total_backtests,
-            avg_win_rate=avg_win_rate,
-            total_pnl=total_pnl,
+            avg_win_rate=avg_win_rate or 0.0,
+            total_pnl=total_pnl or 0.0,
             best_strategy=best_strategy,
             recent_results=recent_results
         )
     
-    def get_backtest_results(self, db: Session, user: User) -> List[BacktestResult]:
-        """Get all backtest results for a user"""
-        return db.query(BacktestResult).filter(BacktestResult.user_id == user.id).all()
+    def get_backtest_results(
+        self,
+        db: Session,
+        user: User,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        strategy_id: Optional[str] = None,
+        created_from: Optional[date] = None,
+        created_to: Optional[date] = None
+    ) -> Tuple[List[BacktestResult], Optional[str]]:
+        """
+        One page of a user's backtest results, newest first, plus the cursor of the next page
+        (None on the last page). Pages are keyed on (created_at, id) rather than offsets, so
+        every page costs the same no matter how deep it is.
+        """
+        query = db.query(BacktestResult).filter(BacktestResult.user_id == user.id)
+        
+        if strategy_id:
+            query = query.filter(BacktestResult.strategy_id == strategy_id)
+        if created_from:
+            query = query.filter(BacktestResult.created_at >= datetime.combine(created_from, time.min))
+        if created_to:
+            query = query.filter(BacktestResult.created_at < datetime.combine(created_to + timedelta(days=1), time.min))
+        if cursor:
+            cursor_created_at, cursor_id = decode_cursor(cursor)
+            query = query.filter(or_(
+                BacktestResult.created_at < cursor_created_at,
+                and_(BacktestResult.created_at == cursor_created_at, BacktestResult.id < cursor_id)
+            ))
+        
+        # One extra row tells whether another page follows
+        rows = query.order_by(BacktestResult.created_at.desc(), BacktestResult.id.desc()).limit(limit + 1).all()
+        page, has_more = rows[:limit], len(rows) > limit
+        next_cursor = encode_cursor(page[-1].created_at, page[-1].id) if has_more and page else None
+        return page, next_cursor
     
     def get_backtest_result_detail(self, db: Session, result_id: int, user: User) -> BacktestResult:
         """Get detailed backtest result by ID"""
@@ -69,3 +103,16 @@ class BacktestService:
             BacktestResult.id == result_id, 
             BacktestResult.user_id == user.id
         ).first()
+
+
+def encode_cursor(created_at: datetime, result_id: int) -> str:
+    """Opaque page cursor for the (created_at, id) keyset"""
+    return base64.urlsafe_b64encode(f"{created_at.isoformat()}|{result_id}".encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        created_at, result_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(created_at), int(result_id)
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError("Invalid cursor")
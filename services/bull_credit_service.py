@@ -0,0 +1,118 @@
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+# Columns the trade log can be filtered on
+FILTER_COLUMNS = ['entry_month', 'exit_reason', 'expiry', 'indicator']
+
+
+class BullCreditStore:
+    """
+    bull_credit.csv held in memory. The file is re-read only when its mtime
+    changes; summary stats and per-column sort orders are computed once per load.
+    """
+
+    def __init__(self, csv_path: Path):
+        self.csv_path = Path(csv_path)
+        self._lock = threading.Lock()
+        self._mtime = None
+        self._df = None
+        self._summary = None
+        self._sort_orders: Dict[str, np.ndarray] = {}
+
+    def frame(self) -> pd.DataFrame:
+        """Current contents; raises FileNotFoundError when the CSV is missing"""
+        mtime = os.stat(self.csv_path).st_mtime_ns
+        if mtime != self._mtime:
+            with self._lock:
+                if mtime != self._mtime:
+                    df = pd.read_csv(self.csv_path)
+                    self._summary = _summarize(df)
+                    self._sort_orders = {}
+                    self._df = df
+                    self._mtime = mtime
+        return self._df
+
+    def summary(self) -> Dict[str, Any]:
+        self.frame()
+        return self._summary
+
+    def filter_values(self) -> Dict[str, List[Any]]:
+        """Distinct values of each filter column, for building the filter dropdowns"""
+        df = self.frame()
+        return {column: sorted(df[column].dropna().unique().tolist(), key=str)
+                for column in FILTER_COLUMNS if column in df.columns}
+
+    def _sort_order(self, df: pd.DataFrame, column: str, descending: bool) -> np.ndarray:
+        """Row positions in column order, missing values last either way; cached per load"""
+        key = (column, descending)
+        order = self._sort_orders.get(key)
+        if order is None:
+            values = df[column].reset_index(drop=True)
+            ascending = values.sort_values(kind='stable', na_position='last').index.to_numpy()
+            if descending:
+                present = int(values.notna().sum())
+                order = np.concatenate([ascending[:present][::-1], ascending[present:]])
+            else:
+                order = ascending
+            self._sort_orders[key] = order
+        return order
+
+    def query(self, filters: Optional[Dict[str, Optional[str]]] = None, sort_by: Optional[str] = None,
+              sort_order: str = 'asc', page: Optional[int] = None, page_size: int = 100) -> Dict[str, Any]:
+        """
+        Rows matching every filter (comma-separated values are OR-ed), sorted by
+        sort_by, optionally paginated (page is 1-based; None returns every row).
+        """
+        df = self.frame()
+        mask = np.ones(len(df), dtype=bool)
+        for column, value in (filters or {}).items():
+            if value is None or column not in df.columns:
+                continue
+            values = [item.strip() for item in str(value).split(',')]
+            mask &= df[column].astype(str).isin(values).to_numpy()
+
+        if sort_by:
+            if sort_by not in df.columns:
+                raise ValueError(f"Unknown sort column: {sort_by}")
+            positions = self._sort_order(df, sort_by, sort_order == 'desc')
+            positions = positions[mask[positions]]
+        else:
+            positions = np.flatnonzero(mask)
+
+        total = len(positions)
+        if page is not None:
+            start = (max(page, 1) - 1) * page_size
+            positions = positions[start:start + page_size]
+
+        rows = df.iloc[positions]
+        return {
+            'data': rows.astype(object).where(rows.notna(), None).to_dict(orient='records'),
+            'total_records': int(total),
+            'page': page,
+            'page_size': page_size if page is not None else total,
+            'total_pages': int(np.ceil(total / page_size)) if page is not None and page_size else 1
+        }
+
+
+def _summarize(df: pd.DataFrame) -> Dict[str, Any]:
+    summary = {
+        "total_records": len(df),
+        "columns": df.columns.tolist(),
+        "numeric_stats": {}
+    }
+
+    # Calculate statistics for numeric columns
+    numeric_columns = df.select_dtypes(include=['int64', 'float64']).columns
+    for col in numeric_columns:
+        summary["numeric_stats"][col] = {
+            "min": float(df[col].min()),
+            "max": float(df[col].max()),
+            "mean": float(df[col].mean()),
+            "median": float(df[col].median())
+        }
+    return summary
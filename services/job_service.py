@@ -0,0 +1,250 @@
+import json
+import uuid
+import asyncio
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from fastapi.encoders import jsonable_encoder
+
+from config.database import SessionLocal, get_mongo_db
+from config.settings import settings
+from engine.sweep import expand_grid, load_sweep_data, run_sweep
+from models.backtest import BacktestResult
+from models.user import User
+from services.backtest_runner import backtest_runner
+from services.result_cache import result_cache
+from services.trade_store import trade_store
+from services.strategy_service import StrategyService
+
+JOB_QUEUED = 'queued'
+JOB_RUNNING = 'running'
+JOB_COMPLETED = 'completed'
+JOB_FAILED = 'failed'
+JOB_CANCELLED = 'cancelled'
+FINISHED_STATES = (JOB_COMPLETED, JOB_FAILED, JOB_CANCELLED)
+
+
+class BacktestJob:
+    """
+    State of one submitted backtest; events holds every progress update in order.
+    A job with a param_grid is a parameter sweep whose ranked results go to leaderboard.
+    """
+
+    def __init__(self, user: User, config: Dict[str, Any], start_date: str, end_date: str,
+                 strategy_id: str = "", name: Optional[str] = None,
+                 param_grid: Optional[Dict[str, List[Any]]] = None, rank_by: str = 'total_pnl'):
+        self.id = uuid.uuid4().hex
+        self.user = user
+        self.user_id = user.id
+        self.strategy_id = strategy_id
+        self.name = name
+        self.config = config
+        self.start_date = start_date
+        self.end_date = end_date
+        self.status = JOB_QUEUED
+        self.stage = "Queued"
+        self.progress = 0
+        self.result_id = None
+        self.error = None
+        self.created_at = datetime.utcnow()
+        self.started_at = None
+        self.finished_at = None
+        self.events: List[Dict[str, Any]] = []
+        self.future = None
+        self.cached = False
+        self.param_grid = param_grid
+        self.rank_by = rank_by
+        self.leaderboard: Optional[List[Dict[str, Any]]] = None
+
+    def record(self, stage: str, progress: int):
+        """progress_callback for BacktestRunner.run_backtest"""
+        self.stage = stage
+        self.progress = progress
+        self.events.append({"seq": len(self.events), "stage": stage, "progress": progress,
+                            "status": self.status, "time": datetime.utcnow().isoformat()})
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "stage": self.stage,
+            "progress": self.progress,
+            "strategy_id": self.strategy_id,
+            "name": self.name,
+            "start_date": self.start_date,
+            "end_date": self.end_date,
+            "result_id": self.result_id,
+            "cached": self.cached,
+            "leaderboard": self.leaderboard,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at
+        }
+
+
+class BacktestJobQueue:
+    """
+    In-process backtest queue. Jobs run on a bounded thread pool so request
+    handlers return immediately with a job id; progress is kept per job for
+    polling and server-sent events, and results are saved to BacktestResult.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, max_finished: int = 200):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers or settings.BACKTEST_WORKERS,
+                                           thread_name_prefix="backtest")
+        self.max_finished = max_finished
+        self.jobs: Dict[str, BacktestJob] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, user: User, config: Dict[str, Any], start_date: str, end_date: str,
+               strategy_id: str = "", name: Optional[str] = None) -> BacktestJob:
+        """Queue a backtest and return its job without waiting for it to start"""
+        return self._enqueue(BacktestJob(user, config, start_date, end_date, strategy_id, name))
+
+    def submit_sweep(self, user: User, config: Dict[str, Any], param_grid: Dict[str, List[Any]],
+                     start_date: str, end_date: str, rank_by: str = 'total_pnl',
+                     name: Optional[str] = None) -> BacktestJob:
+        """Queue a parameter sweep over config; the ranked results end up in job.leaderboard"""
+        return self._enqueue(BacktestJob(user, config, start_date, end_date, name=name,
+                                         param_grid=param_grid, rank_by=rank_by))
+
+    def _enqueue(self, job: BacktestJob) -> BacktestJob:
+        job.record("Queued", 0)
+        with self._lock:
+            self._prune()
+            self.jobs[job.id] = job
+        job.future = self.executor.submit(self._run, job)
+        return job
+
+    def get(self, job_id: str, user_id: int) -> Optional[BacktestJob]:
+        job = self.jobs.get(job_id)
+        return job if job and job.user_id == user_id else None
+
+    def list_jobs(self, user_id: int) -> List[BacktestJob]:
+        jobs = [job for job in list(self.jobs.values()) if job.user_id == user_id]
+        return sorted(jobs, key=lambda job: job.created_at, reverse=True)
+
+    def cancel(self, job_id: str, user_id: int) -> bool:
+        """Cancel a job that has not started yet"""
+        job = self.get(job_id, user_id)
+        if not job or not job.future.cancel():
+            return False
+        job.finished_at = datetime.utcnow()
+        job.record("Cancelled", job.progress)
+        job.status = JOB_CANCELLED
+        return True
+
+    def _run(self, job: BacktestJob):
+        job.status = JOB_RUNNING
+        job.started_at = datetime.utcnow()
+        status = JOB_FAILED
+        try:
+            if job.param_grid is not None:
+                results = self._run_sweep(job)
+            else:
+                results = self._cached_or_run(job)
+            if results.get('success'):
+                if job.param_grid is None:
+                    job.result_id = self._save_result(job, results)
+                status = JOB_COMPLETED
+            else:
+                job.error = results.get('error', 'Backtest failed')
+        except Exception as e:
+            traceback.print_exc()
+            job.error = str(e)
+        job.finished_at = datetime.utcnow()
+        # Last event goes in before the status flips, so streams never end without it
+        job.record("Finished" if status == JOB_COMPLETED else "Failed", job.progress)
+        job.status = status
+
+    def _cached_or_run(self, job: BacktestJob) -> Dict[str, Any]:
+        """Serve a repeat of an identical run on unchanged data from the result cache"""
+        config = backtest_runner.validate_config(job.config)
+        db = SessionLocal()
+        try:
+            results = result_cache.get(db, config, job.start_date, job.end_date)
+            if results is not None:
+                job.cached = True
+                job.record("Loaded cached result", 100)
+                return results
+
+            results = backtest_runner.run_backtest(config, job.start_date, job.end_date,
+                                                   progress_callback=job.record)
+            if results.get('success'):
+                results = trade_store.detach(db, results)
+            result_cache.put(db, config, job.start_date, job.end_date, results)
+            return results
+        finally:
+            db.close()
+
+    def _run_sweep(self, job: BacktestJob) -> Dict[str, Any]:
+        """Load the data once, then run every combination on the sweep process pool"""
+        config = backtest_runner.validate_config(job.config)
+        total = len(expand_grid(job.param_grid))
+        job.record("Loading historical data", 5)
+        shared_data = load_sweep_data(config, job.start_date, job.end_date)
+        job.record(f"Running {total} combinations", 10)
+
+        def progress(result: Dict[str, Any], ranked: List[Dict[str, Any]]):
+            job.leaderboard = list(ranked)
+            job.record(f"Finished {len(ranked)}/{total} combinations", 10 + 90 * len(ranked) // max(total, 1))
+
+        ranked = run_sweep(job.param_grid, shared_data, job.rank_by,
+                           max_workers=settings.SWEEP_WORKERS, progress_callback=progress)
+        job.leaderboard = ranked
+        if any(result.get('success') for result in ranked):
+            return {'success': True}
+        return {'success': False, 'error': ranked[0].get('error', 'No trades generated') if ranked else 'Empty param_grid'}
+
+    def _save_result(self, job: BacktestJob, results: Dict[str, Any]) -> int:
+        db = SessionLocal()
+        try:
+            result = BacktestResult(
+                user_id=job.user_id,
+                strategy_id=job.strategy_id,
+                total_trades=results['total_trades'],
+                winning_trades=results['winning_trades'],
+                losing_trades=results['losing_trades'],
+                win_rate=results['win_rate'],
+                total_pnl=results['total_pnl'],
+                max_drawdown=results['max_drawdown'],
+                sharpe_ratio=results['sharpe_ratio'],
+                results_data=json.dumps({**results, 'start_date': job.start_date, 'end_date': job.end_date,
+                                         'name': job.name, 'config': job.config}, default=str)
+            )
+            db.add(result)
+            db.commit()
+            db.refresh(result)
+        finally:
+            db.close()
+
+        if job.strategy_id:
+            StrategyService(get_mongo_db()).mark_backtest_completed(job.strategy_id, job.user)
+        return result.id
+
+    def _prune(self):
+        """Forget the oldest finished jobs beyond max_finished"""
+        finished = [job for job in self.jobs.values() if job.status in FINISHED_STATES]
+        for job in sorted(finished, key=lambda job: job.created_at)[:max(len(finished) - self.max_finished, 0)]:
+            del self.jobs[job.id]
+
+    async def stream(self, job: BacktestJob, poll_interval: float = 0.5) -> AsyncIterator[str]:
+        """Server-sent events: one 'progress' event per update, then a final event named after the job status"""
+        sent = 0
+        while True:
+            events = job.events[sent:]
+            for event in events:
+                yield f"event: progress\ndata: {json.dumps(event)}\n\n"
+            sent += len(events)
+
+            if job.status in FINISHED_STATES and sent == len(job.events):
+                yield f"event: {job.status}\ndata: {json.dumps(jsonable_encoder(job.to_dict()))}\n\n"
+                return
+            await asyncio.sleep(poll_interval)
+
+
+backtest_jobs = BacktestJobQueue()
@@ -0,0 +1,261 @@
+import io
+import os
+import json
+import argparse
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+import pandas as pd
+
+# Filterable columns of the per-day option CSVs
+SYMBOL_COLUMN = "Symbol"
+STRIKE_COLUMN = "Strike_Price"
+OPTION_TYPE_COLUMN = "Option_Type"
+
+DEFAULT_BATCH_SIZE = 50000
+
+METADATA_FILE = "_metadata.json"  # Per-day sidecar with row counts and distinct symbols/strikes/types
+
+
+class OptionDataService:
+    """
+    Reads the per-day option CSV folders under <data_dir>/<YYYY>/<MON>/GFDLNFO_TICK_OPTIONS_<ddmmyyyy>/.
+
+    Frames are produced file by file in batches of at most batch_size rows, with
+    filters and column projection applied per batch, so a full day can be served
+    without holding it in memory.
+    """
+
+    def __init__(self, data_dir: Path):
+        self.data_dir = Path(data_dir)
+
+    def day_path(self, date: str) -> Path:
+        """Folder of one trading day (date in YYYY-MM-DD format)"""
+        date_obj = datetime.strptime(date, "%Y-%m-%d")
+        return (self.data_dir / date_obj.strftime("%Y") / date_obj.strftime("%b").upper()
+                / f"GFDLNFO_TICK_OPTIONS_{date_obj.strftime('%d%m%Y')}")
+
+    def day_files(self, date: str) -> List[Path]:
+        return sorted(self.day_path(date).glob("*.csv"))
+
+    def file_stamps(self, date: str) -> Dict[str, List[int]]:
+        """{file name: [size, mtime_ns]} of a day's CSVs, used to tell whether the sidecar is current"""
+        stamps = {}
+        for file in self.day_files(date):
+            stat = file.stat()
+            stamps[file.name] = [stat.st_size, stat.st_mtime_ns]
+        return stamps
+
+    def scan_metadata(self, date: str) -> Dict:
+        """Metadata of a day from its CSVs (only the symbol/strike/type columns are read)"""
+        stamps = self.file_stamps(date)
+        files = {}
+        symbols, strikes, option_types = set(), set(), set()
+        for file in self.day_files(date):
+            try:
+                header = pd.read_csv(file, nrows=0).columns
+                usecols = [column for column in (SYMBOL_COLUMN, STRIKE_COLUMN, OPTION_TYPE_COLUMN) if column in header]
+                df = pd.read_csv(file, usecols=usecols or [header[0]])
+            except Exception as e:
+                print(f"Error reading file {file}: {str(e)}")
+                continue
+
+            file_symbols = df[SYMBOL_COLUMN].dropna().unique().tolist() if SYMBOL_COLUMN in df.columns else []
+            file_strikes = df[STRIKE_COLUMN].dropna().unique().tolist() if STRIKE_COLUMN in df.columns else []
+            file_types = df[OPTION_TYPE_COLUMN].dropna().unique().tolist() if OPTION_TYPE_COLUMN in df.columns else []
+            files[file.name] = {"rows": len(df), "symbols": file_symbols, "strike_prices": file_strikes,
+                                "option_types": file_types}
+            symbols.update(file_symbols)
+            strikes.update(file_strikes)
+            option_types.update(file_types)
+
+        metadata = {
+            "date": date,
+            "total_records": sum(info["rows"] for info in files.values()),
+            "symbols": sorted(symbols),
+            "strike_prices": sorted(strikes),
+            "option_types": sorted(option_types),
+            "files": files,
+            "stamps": stamps,
+            "built_at": datetime.utcnow().isoformat()
+        }
+        return metadata
+
+    def build_metadata(self, date: str) -> Dict:
+        """Scan a day once and write its metadata sidecar"""
+        metadata = self.scan_metadata(date)
+
+        # Temp file + rename so a concurrent reader never sees a half-written sidecar
+        path = self.day_path(date) / METADATA_FILE
+        try:
+            tmp_path = path.with_suffix(".tmp")
+            with open(tmp_path, "w") as f:
+                json.dump(_plain(metadata), f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Could not write metadata for {date}: {str(e)}")
+        return metadata
+
+    def read_metadata(self, date: str) -> Optional[Dict]:
+        """The day's sidecar as last written, without checking it against the CSVs; None when absent"""
+        path = self.day_path(date) / METADATA_FILE
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def current_metadata(self, date: str) -> Optional[Dict]:
+        """The day's sidecar if it was written after the last change to its CSVs, else None"""
+        metadata = self.read_metadata(date)
+        return metadata if metadata and metadata.get("stamps") == self.file_stamps(date) else None
+
+    def day_metadata(self, date: str) -> Dict:
+        """
+        Read-only metadata for request handlers: the sidecar kept current by
+        build_all_metadata, or an unsaved scan for a day that has none yet
+        """
+        return self.read_metadata(date) or self.scan_metadata(date)
+
+    def build_all_metadata(self) -> int:
+        """Write every missing or stale sidecar (the ingest step after copying new data in); returns days built"""
+        built = 0
+        for day_path in sorted(self.data_dir.glob("*/*/GFDLNFO_TICK_OPTIONS_*")):
+            date = datetime.strptime(day_path.name.split("_")[-1], "%d%m%Y").strftime("%Y-%m-%d")
+            if self.current_metadata(date) is None:
+                self.build_metadata(date)
+                built += 1
+        return built
+
+    def iter_frames(self, date: str, filters: Optional[Dict] = None, columns: Optional[List[str]] = None,
+                    batch_size: int = DEFAULT_BATCH_SIZE) -> Iterator[pd.DataFrame]:
+        """
+        Filtered, projected batches of a day's rows. filters maps a column to the
+        value it must equal (e.g. {"Option_Type": "CE"}); None values are ignored.
+        """
+        filters = {column: value for column, value in (filters or {}).items() if value is not None}
+
+        for file in self.day_files(date):
+            try:
+                header = pd.read_csv(file, nrows=0).columns
+                if any(column not in header for column in filters):
+                    continue  # a filter on a column this file lacks can never match
+                usecols = None
+                if columns:
+                    wanted = set(columns) | set(filters)
+                    usecols = [column for column in header if column in wanted]
+                    if not usecols:
+                        continue
+
+                for chunk in pd.read_csv(file, usecols=usecols, chunksize=batch_size):
+                    for column, value in filters.items():
+                        chunk = chunk[_matches(chunk[column], value)]
+                    if columns:
+                        chunk = chunk[[column for column in columns if column in chunk.columns]]
+                    if not chunk.empty:
+                        yield chunk
+            except Exception as e:
+                print(f"Error reading file {file}: {str(e)}")
+                continue
+
+    def stream_ndjson(self, date: str, filters: Optional[Dict] = None, columns: Optional[List[str]] = None,
+                      batch_size: int = DEFAULT_BATCH_SIZE) -> Iterator[bytes]:
+        """One JSON object per line, one chunk per batch"""
+        for frame in self.iter_frames(date, filters, columns, batch_size):
+            lines = frame.to_json(orient="records", lines=True, date_format="iso")
+            yield (lines if lines.endswith("\n") else lines + "\n").encode()
+
+    def stream_arrow(self, date: str, filters: Optional[Dict] = None, columns: Optional[List[str]] = None,
+                     batch_size: int = DEFAULT_BATCH_SIZE) -> Iterator[bytes]:
+        """
+        Arrow IPC stream; the schema is fixed by the first batch (integers widened to float64).
+        Later batches are coerced to it, and a batch that cannot be is skipped.
+        """
+        import pyarrow as pa
+
+        sink = io.BytesIO()
+        writer = None
+        schema = None
+        for frame in self.iter_frames(date, filters, columns, batch_size):
+            if schema is None:
+                schema = _widen_integers(pa.Schema.from_pandas(frame, preserve_index=False))
+                writer = pa.ipc.new_stream(sink, schema)
+            try:
+                table = _conform(frame, schema)
+            except (pa.ArrowException, ValueError, TypeError) as e:
+                print(f"Skipping batch of {len(frame)} rows for {date} that does not fit the stream schema: {str(e)}")
+                continue
+            for batch in table.to_batches():
+                writer.write_batch(batch)
+            yield _drain(sink)
+
+        if writer is not None:
+            writer.close()
+            yield _drain(sink)
+
+
+def _matches(series: pd.Series, value) -> pd.Series:
+    """Equality filter that compares numbers numerically and text case-insensitively"""
+    if pd.api.types.is_numeric_dtype(series):
+        return series == float(value)
+    return series.astype(str).str.upper() == str(value).upper()
+
+
+def _plain(value):
+    """numpy scalars -> Python numbers so the sidecar is plain JSON"""
+    if isinstance(value, dict):
+        return {key: _plain(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_plain(item) for item in value]
+    return value.item() if hasattr(value, "item") else value
+
+
+def _widen_integers(schema):
+    import pyarrow as pa
+    return pa.schema([pa.field(field.name, pa.float64()) if pa.types.is_integer(field.type) else field
+                      for field in schema])
+
+
+def _conform(frame: pd.DataFrame, schema):
+    """
+    A frame as a table of the stream schema: missing columns become null, numeric
+    columns read as text are parsed (unparseable values become null) and text
+    columns read as numbers are formatted.
+    """
+    import pyarrow as pa
+
+    frame = frame.reindex(columns=schema.names)
+    try:
+        return pa.Table.from_pandas(frame, schema=schema, preserve_index=False, safe=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        pass
+
+    coerced = {}
+    for field in schema:
+        column = frame[field.name]
+        if pa.types.is_floating(field.type):
+            column = pd.to_numeric(column, errors="coerce")
+        elif pa.types.is_string(field.type) or pa.types.is_large_string(field.type):
+            column = column.astype(object).where(column.notna(), None)
+            column = column.map(lambda value: value if value is None else str(value))
+        coerced[field.name] = column
+    return pa.Table.from_pandas(pd.DataFrame(coerced), schema=schema, preserve_index=False, safe=False)
+
+
+def _drain(sink: io.BytesIO) -> bytes:
+    data = sink.getvalue()
+    sink.seek(0)
+    sink.truncate()
+    return data
+
+
+if __name__ == "__main__":
+    from config.settings import settings
+
+    parser = argparse.ArgumentParser(description="Write or refresh the per-day option metadata sidecars")
+    parser.add_argument("--data-dir", default=settings.OPTION_DATA_DIR, help="Root of the <YYYY>/<MON>/ day folders")
+    args = parser.parse_args()
+
+    count = OptionDataService(args.data_dir).build_all_metadata()
+    print(f"--- Built metadata for {count} days ---")
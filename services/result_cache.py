@@ -0,0 +1,110 @@
+import os
+import json
+import hashlib
+from datetime import date, datetime
+from typing import Any, Dict, Optional
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from engine.candles import get_candle_store
+from models.backtest import BacktestCache
+from zip_read import archive_version
+
+# Part of every cache key. Bump it whenever a change to the engine (signals,
+# simulation, exits) or to the metrics alters run_backtest output, so results
+# computed by the old code stop matching.
+ENGINE_VERSION = 1
+
+
+class ResultCache:
+    """
+    Content-addressed store of run_backtest outputs in the backtest_cache table.
+
+    The key is a hash of ENGINE_VERSION, the validated config, the date window and a
+    data-version stamp built from the candle partitions, the option archives and the
+    expiry / trading date files. When any of those files change the stamp changes, so old
+    entries simply stop matching and are replaced on the next run.
+    """
+
+    def __init__(self, expiry_dates_csv: str = 'files/expiry_dates.csv',
+                 trading_dates_csv: str = 'files/trading_dates.csv'):
+        self.expiry_dates_csv = expiry_dates_csv
+        self.trading_dates_csv = trading_dates_csv
+
+    def config_hash(self, config: Dict[str, Any]) -> str:
+        canonical = json.dumps(config, sort_keys=True, separators=(',', ':'), default=str)
+        return hashlib.sha256(canonical.encode()).hexdigest()
+
+    def data_version(self, config: Dict[str, Any], start_date: str, end_date: str) -> Optional[str]:
+        """Stamp of every input the backtest reads; None while the window includes today's live session"""
+        if end_date >= date.today().strftime('%Y-%m-%d'):
+            return None
+
+        store = get_candle_store(self.trading_dates_csv)
+        parts = [
+            store.data_version(config['instrument_token'], start_date, end_date, 'minute'),
+            archive_version(start_date, end_date),
+            _file_stamp(self.expiry_dates_csv),
+            _file_stamp(self.trading_dates_csv),
+        ]
+        return hashlib.sha256("|".join(parts).encode()).hexdigest()
+
+    def cache_key(self, config_hash: str, start_date: str, end_date: str, data_version: str) -> str:
+        key = f"{ENGINE_VERSION}:{config_hash}:{start_date}:{end_date}:{data_version}"
+        return hashlib.sha256(key.encode()).hexdigest()
+
+    def get(self, db: Session, config: Dict[str, Any], start_date: str, end_date: str) -> Optional[Dict[str, Any]]:
+        """Cached results for this exact config, window and data, or None"""
+        data_version = self.data_version(config, start_date, end_date)
+        if data_version is None:
+            return None
+
+        key = self.cache_key(self.config_hash(config), start_date, end_date, data_version)
+        entry = db.query(BacktestCache).filter(BacktestCache.cache_key == key).first()
+        if not entry:
+            return None
+
+        entry.hits = (entry.hits or 0) + 1
+        entry.last_used_at = datetime.utcnow()
+        db.commit()
+        return json.loads(entry.results_data)
+
+    def put(self, db: Session, config: Dict[str, Any], start_date: str, end_date: str, results: Dict[str, Any]) -> bool:
+        """Store successful results; entries for the same run on older data are dropped"""
+        data_version = self.data_version(config, start_date, end_date)
+        if data_version is None or not results.get('success'):
+            return False
+
+        config_hash = self.config_hash(config)
+        try:
+            self._replace(db, config_hash, start_date, end_date, data_version, results)
+        except IntegrityError:
+            db.rollback()  # the same run finished concurrently and was stored first
+            return False
+        return True
+
+    def _replace(self, db, config_hash, start_date, end_date, data_version, results):
+        db.query(BacktestCache).filter(
+            BacktestCache.config_hash == config_hash,
+            BacktestCache.start_date == start_date,
+            BacktestCache.end_date == end_date
+        ).delete()
+        db.add(BacktestCache(
+            cache_key=self.cache_key(config_hash, start_date, end_date, data_version),
+            config_hash=config_hash,
+            start_date=start_date,
+            end_date=end_date,
+            data_version=data_version,
+            results_data=json.dumps(results, default=str)
+        ))
+        db.commit()
+
+
+def _file_stamp(path):
+    if not os.path.exists(path):
+        return f"{path}:-"
+    stat = os.stat(path)
+    return f"{path}:{stat.st_mtime_ns}:{stat.st_size}"
+
+
+result_cache = ResultCache()
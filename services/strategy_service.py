@@ -1,7 +1,7 @@
 from pymongo.database import Database
 from bson import ObjectId
 from datetime import datetime
-from typing import List, Optional
+from typing import Dict, List, Optional
 from schemas.strategy import StrategyCreate, StrategyUpdate, StrategyResponse
 from models.user import User
 
@@ -39,6 +39,9 @@ class StrategyService:
     
     def get_strategy(self, strategy_id: str, user: User) -> Optional[StrategyResponse]:
         """Get a specific strategy by ID"""
+        if not ObjectId.is_valid(strategy_id):
+            return None  # e.g. results of ad-hoc /execute runs, which have no strategy
+        
         strategy = self.collection.find_one({
             "_id": ObjectId(strategy_id),
             "user_id": user.id
@@ -106,6 +109,18 @@ class StrategyService:
         
         return self._doc_to_response(duplicated_doc)
     
+    def get_strategy_names(self, strategy_ids: List[str], user: User) -> Dict[str, str]:
+        """Names of many strategies in one query, keyed by strategy ID (unknown IDs are left out)"""
+        object_ids = list({ObjectId(strategy_id) for strategy_id in strategy_ids if ObjectId.is_valid(strategy_id)})
+        if not object_ids:
+            return {}
+        
+        docs = self.collection.find(
+            {"_id": {"$in": object_ids}, "user_id": user.id},
+            {"name": 1}
+        )
+        return {str(doc["_id"]): doc["name"] for doc in docs}
+    
     def count_user_strategies(self, user: User) -> int:
         """Count active strategies for a user"""
         return self.collection.count_documents({
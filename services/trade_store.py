@@ -0,0 +1,159 @@
+import io
+import json
+import hashlib
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from models.backtest import TradeBlob, TradeChunk
+
+ROW_GROUP_SIZE = 5000  # Unit of range reads: a page only loads and decompresses the chunks it overlaps
+
+
+def encode_trades(trades: pd.DataFrame) -> bytes:
+    """Trade log as zstd-compressed Parquet"""
+    sink = io.BytesIO()
+    pq.write_table(pa.Table.from_pandas(trades, preserve_index=False), sink,
+                   compression='zstd', row_group_size=ROW_GROUP_SIZE)
+    return sink.getvalue()
+
+
+def encode_chunks(trades: pd.DataFrame) -> List[tuple]:
+    """(first_row, row_count, zstd Parquet) per ROW_GROUP_SIZE rows, all with the schema of the whole log"""
+    table = pa.Table.from_pandas(trades, preserve_index=False)
+    chunks = []
+    for first_row in range(0, table.num_rows, ROW_GROUP_SIZE):
+        part = table.slice(first_row, ROW_GROUP_SIZE)
+        sink = io.BytesIO()
+        pq.write_table(part, sink, compression='zstd')
+        chunks.append((first_row, part.num_rows, sink.getvalue()))
+    return chunks
+
+
+def read_trades(data: bytes, columns: Optional[List[str]] = None, offset: int = 0,
+                limit: Optional[int] = None) -> pd.DataFrame:
+    """Rows [offset, offset + limit) of an encoded trade log, reading only the needed row groups and columns"""
+    parquet = pq.ParquetFile(io.BytesIO(data))
+    if columns:
+        columns = [column for column in columns if column in parquet.schema_arrow.names]
+    total = parquet.metadata.num_rows
+    offset = min(max(offset, 0), total)
+    stop = total if limit is None else min(offset + max(limit, 0), total)
+
+    groups, first_row, row = [], 0, 0
+    for index in range(parquet.num_row_groups):
+        rows = parquet.metadata.row_group(index).num_rows
+        if row + rows > offset and row < stop:
+            if not groups:
+                first_row = row
+            groups.append(index)
+        row += rows
+
+    if not groups:
+        names = columns if columns is not None else parquet.schema_arrow.names
+        return pd.DataFrame(columns=names)
+    table = parquet.read_row_groups(groups, columns=columns)
+    return table.slice(offset - first_row, stop - offset).to_pandas()
+
+
+def trade_records(trades: pd.DataFrame) -> List[Dict[str, Any]]:
+    """JSON-ready rows, missing values as None"""
+    records = trades.astype(object).where(trades.notna(), None)
+    for column in records.columns:
+        if trades[column].dtype == object:
+            # Parquet list columns (e.g. multi-leg detail) come back as numpy arrays
+            records[column] = records[column].map(lambda value: value.tolist() if isinstance(value, np.ndarray) else value)
+    return records.to_dict(orient='records')
+
+
+class TradeStore:
+    """
+    Content-addressed trade logs: a backtest_trade_blobs row per log and its rows in
+    ROW_GROUP_SIZE chunks in backtest_trade_chunks, so a page reads only its chunks.
+    Identical logs (e.g. a cached re-run) are stored once and referenced by digest from results_data.
+    """
+
+    def save(self, db: Session, trades) -> Optional[str]:
+        """Store a trade log (list of dicts or DataFrame) in row chunks; returns its digest, or None when empty"""
+        trades = trades if isinstance(trades, pd.DataFrame) else pd.DataFrame(trades)
+        if trades.empty:
+            return None
+
+        chunks = encode_chunks(trades)
+        digest = hashlib.sha256(b"".join(data for _, _, data in chunks)).hexdigest()
+        if db.query(TradeBlob.digest).filter(TradeBlob.digest == digest).first():
+            return digest
+
+        try:
+            db.add(TradeBlob(digest=digest, trade_count=len(trades), columns=json.dumps(list(trades.columns))))
+            db.add_all([TradeChunk(digest=digest, first_row=first_row, row_count=row_count, data=data)
+                        for first_row, row_count, data in chunks])
+            db.commit()
+        except IntegrityError:
+            db.rollback()  # stored concurrently by another job
+        return digest
+
+    def _chunk_tables(self, db: Session, digest: str, columns: Optional[List[str]] = None,
+                      offset: int = 0, stop: Optional[int] = None):
+        """(first_row, table) of the chunks overlapping rows [offset, stop), fetching only those rows"""
+        query = db.query(TradeChunk).filter(TradeChunk.digest == digest,
+                                            TradeChunk.first_row + TradeChunk.row_count > offset)
+        if stop is not None:
+            query = query.filter(TradeChunk.first_row < stop)
+        return [(chunk.first_row, pq.read_table(io.BytesIO(chunk.data), columns=columns))
+                for chunk in query.order_by(TradeChunk.first_row)]
+
+    def raw(self, db: Session, digest: str) -> Optional[bytes]:
+        """Whole log as one zstd Parquet file"""
+        blob = db.query(TradeBlob).filter(TradeBlob.digest == digest).first()
+        if not blob:
+            return None
+        if blob.data is not None:
+            return blob.data  # stored whole, before logs were chunked
+        tables = [table for _, table in self._chunk_tables(db, digest)]
+        sink = io.BytesIO()
+        pq.write_table(pa.concat_tables(tables), sink, compression='zstd', row_group_size=ROW_GROUP_SIZE)
+        return sink.getvalue()
+
+    def load(self, db: Session, digest: str, columns: Optional[List[str]] = None, offset: int = 0,
+             limit: Optional[int] = None) -> Optional[pd.DataFrame]:
+        """Rows [offset, offset + limit) of a stored log; only the chunks they overlap are read from the database"""
+        blob = db.query(TradeBlob.digest, TradeBlob.trade_count, TradeBlob.columns) \
+            .filter(TradeBlob.digest == digest).first()
+        if not blob:
+            return None
+
+        names = json.loads(blob.columns) if blob.columns else []
+        if columns:
+            columns = [column for column in columns if column in names]
+        offset = min(max(offset, 0), blob.trade_count)
+        stop = blob.trade_count if limit is None else min(offset + max(limit, 0), blob.trade_count)
+
+        chunks = self._chunk_tables(db, digest, columns, offset, stop) if stop > offset else []
+        if not chunks:
+            if stop > offset:
+                # Stored whole, before logs were chunked
+                data = db.query(TradeBlob.data).filter(TradeBlob.digest == digest).scalar()
+                return read_trades(data, columns, offset, limit)
+            return pd.DataFrame(columns=columns if columns is not None else names)
+
+        first_row = chunks[0][0]
+        table = pa.concat_tables([table for _, table in chunks])
+        return table.slice(offset - first_row, stop - offset).to_pandas()
+
+    def detach(self, db: Session, results: Dict[str, Any]) -> Dict[str, Any]:
+        """Move results['trades'] into the store, leaving trades_ref / trade_count in its place"""
+        if 'trades' not in results:
+            return results
+        detached = {key: value for key, value in results.items() if key != 'trades'}
+        detached['trades_ref'] = self.save(db, results['trades'])
+        detached['trade_count'] = len(results['trades'])
+        return detached
+
+
+trade_store = TradeStore()
@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+from engine.kernels import _path_exit_compiled, _path_exit_loop, _path_exit_numpy, evaluate_exit
+
+
+def random_paths(count, seed=1):
+    """Random kernel arguments (everything but leg_exit), with NaN gaps in the leg quotes"""
+    rng = np.random.default_rng(seed)
+    for _ in range(count):
+        n, k = int(rng.integers(1, 60)), int(rng.integers(0, 4))
+        leg_pnl = np.cumsum(rng.normal(0, 30, (n, k)), axis=0)
+        leg_pnl[rng.random((n, k)) < 0.1] = np.nan
+        spot_low = 22000 - np.cumsum(rng.random(n) * 3)
+        leg_target = np.where(rng.random(k) < 0.5, rng.random(k) * 150, 0.0)
+        leg_stop = np.where(rng.random(k) < 0.5, rng.random(k) * 150, 0.0)
+        yield (
+            spot_low, leg_pnl, leg_target, leg_stop, bool(rng.random() < 0.5),
+            float(rng.choice([0, rng.random() * 300])),
+            float(rng.choice([0, rng.random() * 300])),
+            float(rng.choice([0, rng.random() * 150])),
+            float(rng.choice([0, 22000 - rng.random() * 60])),
+            int(rng.choice([0, rng.integers(1, 80)])),
+        )
+
+
+def run(kernel, args):
+    leg_exit = np.full(args[1].shape[1], -1, dtype=np.int64)
+    index, reason, pnl = kernel(*args, leg_exit)
+    return int(index), int(reason), float(pnl), leg_exit
+
+
+def assert_same(a, b):
+    assert a[:2] == b[:2]
+    assert (np.isnan(a[2]) and np.isnan(b[2])) or np.isclose(a[2], b[2])
+    assert (a[3] == b[3]).all()
+
+
+@pytest.mark.skipif(_path_exit_compiled is None, reason="numba is not installed")
+def test_compiled_kernel_matches_numpy():
+    for args in random_paths(5000):
+        assert_same(run(_path_exit_compiled, args), run(_path_exit_numpy, args))
+
+
+def test_loop_matches_numpy():
+    for args in random_paths(2000, seed=2):
+        assert_same(run(_path_exit_loop, args), run(_path_exit_numpy, args))
+
+
+@pytest.mark.parametrize("use_compiled", [True, False])
+def test_max_hold_below_one_exits_on_first_candle(use_compiled):
+    spot_low, leg_pnl = np.full(5, 100.0), np.zeros((5, 1))
+    assert evaluate_exit(spot_low, leg_pnl, {'max_hold': 0}, use_compiled)[:2] == (0, 'time_exit')
+    assert evaluate_exit(spot_low, leg_pnl, {'max_hold': 3}, use_compiled)[:2] == (2, 'time_exit')
+    assert evaluate_exit(spot_low, leg_pnl, {}, use_compiled)[:2] == (-1, None)
@@ -0,0 +1,140 @@
+import contextlib
+import io
+from datetime import time, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from engine.simulation import get_option_strikes, simulate_trades_with_stoploss_extended
+
+CONFIG = {'sell_otm': 0, 'spread': 200, 'lot_size': 50, 'max_profit_per_lot': 5,
+          'spot_sl_pct': 0.002, 'min_premium': 30}
+EXPIRY_DATES = pd.DataFrame({'expiry_date': pd.to_datetime(['2024-01-04', '2024-01-11']).date})
+
+
+def minute_candles(days, tz, rng):
+    dates = []
+    for day in pd.bdate_range('2024-01-01', periods=days):
+        dates.extend(pd.date_range(day + pd.Timedelta('9h15min'), day + pd.Timedelta('15h29min'), freq='1min'))
+    dates = pd.DatetimeIndex(dates)
+    if tz:
+        dates = dates.tz_localize(tz)
+    close = 22000 + np.cumsum(rng.normal(0, 8, len(dates)))
+    df = pd.DataFrame({'date': dates, 'open': close + rng.normal(0, 2, len(dates)), 'close': close})
+    df['high'] = np.maximum(df['open'], df['close']) + np.abs(rng.normal(0, 3, len(dates)))
+    df['low'] = np.minimum(df['open'], df['close']) - np.abs(rng.normal(0, 3, len(dates)))
+    return df
+
+
+class TickSource:
+    """fetch_option_data_fn / create_symbol_format_fn pair over random tick frames"""
+
+    def __init__(self, rng):
+        self.rng = rng
+        self.frames = {}
+
+    def symbol(self, leg, date_str):
+        return f"{leg['expiry']}:{leg['strike']}{leg['instrument_type']}", date_str, leg['name']
+
+    def fetch(self, symbol, date_str, name):
+        if (symbol, date_str) not in self.frames:
+            secs = np.sort(self.rng.choice(np.arange(9 * 3600 + 15 * 60, 15 * 3600 + 30 * 60), 2000, replace=False))
+            ltp = np.abs(60 + np.cumsum(self.rng.normal(0, 0.8, len(secs))))
+            times = [f"{s // 3600:02d}:{s // 60 % 60:02d}:{s % 60:02d}" for s in secs]
+            self.frames[(symbol, date_str)] = pd.DataFrame({'time': times, 'LTP': ltp})
+        return self.frames[(symbol, date_str)]
+
+
+def original_loop(entries_df, df_1min, expiry_dates, fetch_option_data_fn, create_symbol_format_fn, config):
+    """
+    The candle-by-candle simulation this engine replaced, kept as the reference. It walks
+    every future candle (not the debugging head(1)) and tracks last-seen leg prices per trade.
+    """
+    trades = []
+    next_trade_start_time = None
+    for _, row in entries_df.iterrows():
+        entry_time = row['execution_time']
+        if next_trade_start_time and entry_time <= next_trade_start_time:
+            continue
+        if entry_time.time() >= time(15, 0):
+            continue
+        entry_price = row['execution_open']
+        sl_price = entry_price * (1 - config['spot_sl_pct'])
+        target_pnl = config['max_profit_per_lot'] * config['lot_size']
+        execution_date = entry_time.date()
+        try:
+            base_expiry_idx = expiry_dates[expiry_dates['expiry_date'] >= execution_date].index[0]
+            base_expiry = expiry_dates.iloc[base_expiry_idx]['expiry_date']
+            next_expiry = (expiry_dates.iloc[base_expiry_idx + 1]['expiry_date']
+                           if base_expiry_idx + 1 < len(expiry_dates) else base_expiry)
+            strikes = get_option_strikes(entry_price, config)
+
+            def leg_ticks(expiry, strike):
+                leg = {'name': 'NIFTY', 'expiry': str(expiry), 'strike': strike, 'instrument_type': 'PE'}
+                data = fetch_option_data_fn(*create_symbol_format_fn(leg, str(execution_date))).copy()
+                data['time'] = pd.to_datetime(data['time'], format='%H:%M:%S').dt.time
+                return data[data['time'] > entry_time.time()]
+
+            test_sell = leg_ticks(base_expiry, strikes['sell_pe'])
+            valid_expiry = next_expiry if test_sell.iloc[3]['LTP'] < config['min_premium'] else base_expiry
+            buy_data = leg_ticks(valid_expiry, strikes['buy_pe'])
+            sell_data = leg_ticks(valid_expiry, strikes['sell_pe'])
+            buy_entry, sell_entry = buy_data.iloc[3]['LTP'], sell_data.iloc[3]['LTP']
+
+            minute_counter = 0
+            exit_time = exit_price = exit_reason = buy_exit = sell_exit = None
+            last = {}
+            for _, candle in df_1min[df_1min['date'] >= entry_time].iterrows():
+                if candle['date'].time() >= time(15, 30):
+                    continue
+                buy_row = buy_data[buy_data['time'] >= candle['date'].time()].head(1)
+                sell_row = sell_data[sell_data['time'] >= candle['date'].time()].head(1)
+                if not buy_row.empty and not sell_row.empty:
+                    last['buy'], last['sell'] = buy_row.iloc[0]['LTP'], sell_row.iloc[0]['LTP']
+                    last['pnl'] = ((sell_entry - last['sell']) - (buy_entry - last['buy'])) * config['lot_size']
+                    if last['pnl'] >= target_pnl:
+                        exit_time, exit_price, exit_reason = candle['date'], candle['close'], 'target_hit'
+                        buy_exit, sell_exit = last['buy'], last['sell']
+                        break
+                if candle['low'] <= sl_price:
+                    exit_time, exit_price, exit_reason = candle['date'], sl_price, 'stop_loss'
+                    buy_exit, sell_exit = last.get('buy'), last.get('sell')
+                    break
+                minute_counter += 1
+                if minute_counter >= config['max_hold']:
+                    exit_time, exit_price, exit_reason = candle['date'], candle['close'], 'time_exit'
+                    buy_exit, sell_exit = last.get('buy'), last.get('sell')
+                    break
+
+            trades.append({
+                'entry_time': entry_time, 'exit_time': exit_time, 'exit_price': exit_price,
+                'exit_reason': exit_reason, 'expiry': str(valid_expiry),
+                'pnl': last['pnl'] if 'pnl' in last else (exit_price - entry_price) * config['lot_size'],
+                'buy_leg_exit_price': buy_exit, 'sell_leg_exit_price': sell_exit,
+            })
+            next_trade_start_time = exit_time + timedelta(minutes=1)
+        except Exception:
+            continue
+    return pd.DataFrame(trades)
+
+
+@pytest.mark.parametrize("tz", [None, 'Asia/Kolkata'])
+@pytest.mark.parametrize("max_hold", [0, 5, 60, 400])
+def test_matches_original_loop(tz, max_hold):
+    rng = np.random.default_rng(0)
+    df_1min = minute_candles(3, tz, rng)
+    source = TickSource(rng)
+    picked = df_1min.iloc[np.sort(rng.choice(len(df_1min), 25, replace=False))]
+    entries = pd.DataFrame({'signal_time': picked['date'].values, 'execution_time': picked['date'],
+                            'execution_open': picked['open'].values}).reset_index(drop=True)
+    config = {**CONFIG, 'max_hold': max_hold}
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        vectorized = simulate_trades_with_stoploss_extended(
+            entries, df_1min, EXPIRY_DATES, source.fetch, source.symbol, config)
+    expected = original_loop(entries, df_1min, EXPIRY_DATES, source.fetch, source.symbol, config)
+
+    assert len(expected)
+    pd.testing.assert_frame_equal(vectorized[list(expected.columns)].reset_index(drop=True),
+                                  expected.reset_index(drop=True), check_dtype=False)
@@ -0,0 +1,191 @@
+import os
+import zipfile
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+import pandas as pd
+import pyarrow.parquet as pq
+from utils.ticks import SECONDS_COLUMN, prepare_tick_frame
+
+# Columnar copy of the GFDL option tick archive.
+#
+# Layout: <store_folder>/<SYMBOL>/<YYYY-MM-DD>/<CONTRACT>.parquet
+# e.g.    D:\FNODATA_STORE\NIFTY\2024-12-05\NIFTY05DEC2424400CE.parquet
+#
+# The ingest command below walks the nested ZIP tree read by zip_read.py
+# (<base_folder>/NIFTY<year>/<MON_YYYY>.zip -> GFDLNFO_TICK_OPTIONS_<ddmmyyyy>*.zip
+# -> <date_folder>/Options/<CONTRACT>.NFO.csv) once and writes one Parquet file
+# per contract per day, so a backtest reads a single small file with only the
+# columns it needs instead of decompressing ZIP-in-ZIP on every call.
+
+base_folder = r"D:\FNODATA"
+store_folder = r"D:\FNODATA_STORE"
+
+DONE_MARKER = "_SUCCESS"
+
+
+def get_day_path(symbol, date):
+    """ Folder holding all contracts of one symbol for one trading day """
+    return os.path.join(store_folder, symbol, date.strftime("%Y-%m-%d"))
+
+
+def fetch_csv_from_zip(target_csv_name, date_str, symbol, columns=None):
+    """ Drop-in replacement for zip_read.fetch_csv_from_zip backed by the Parquet store """
+    date = datetime.strptime(date_str, "%d/%m/%Y")
+    file_path = os.path.join(get_day_path(symbol, date), f"{target_csv_name}.parquet")
+
+    if not os.path.exists(file_path):
+        return None
+
+    try:
+        # Days ingested before the seconds column existed get it derived on read instead
+        if columns is not None and 'time' in columns and SECONDS_COLUMN not in columns:
+            if SECONDS_COLUMN in pq.read_schema(file_path).names:
+                columns = list(columns) + [SECONDS_COLUMN]
+        return prepare_tick_frame(pd.read_parquet(file_path, columns=columns))
+    except Exception as e:
+        print(f"Error reading Parquet: {e}")
+
+    return None
+
+
+def fetch_many(requests, columns=None):
+    """ Bulk-load (target_csv_name, date_str, symbol) requests from the Parquet store """
+    results = {}
+    for target_csv_name, date_str, symbol in requests:
+        df = fetch_csv_from_zip(target_csv_name, date_str, symbol, columns)
+        if df is not None:
+            results[(target_csv_name, date_str)] = df
+    return results
+
+
+def list_monthly_zips(source_folder, symbol, years=None):
+    """ Yield (year, path) for every <symbol><year>/<MON_YYYY>.zip in the archive """
+    for year_dir in sorted(os.listdir(source_folder)):
+        if not year_dir.startswith(symbol):
+            continue
+        year = year_dir[len(symbol):]
+        if not year.isdigit() or (years and year not in years):
+            continue
+
+        year_path = os.path.join(source_folder, year_dir)
+        for file_name in sorted(os.listdir(year_path)):
+            if file_name.upper().endswith(".ZIP"):
+                yield year, os.path.join(year_path, file_name)
+
+
+def ingest_inner_zip(inner_zip, date_folder, day_path):
+    """ Convert every option CSV of one trading day into Parquet files """
+    os.makedirs(day_path, exist_ok=True)
+    marker = os.path.join(day_path, DONE_MARKER)
+    if os.path.exists(marker):
+        os.remove(marker)  # re-ingest: the day is only complete again once every member converts
+    written = 0
+    failed = 0
+
+    for member in inner_zip.namelist():
+        if not (member.startswith(f"{date_folder}/Options/") and member.endswith(".NFO.csv")):
+            continue
+
+        contract = os.path.basename(member)[:-len(".NFO.csv")]
+        try:
+            with inner_zip.open(member) as f:
+                df = pd.read_csv(f)
+
+            # Stored with the integer seconds column so reads never re-parse the time strings
+            df = prepare_tick_frame(df)
+
+            # Write to a temp file first so an interrupted ingest never leaves a truncated file behind
+            target = os.path.join(day_path, f"{contract}.parquet")
+            tmp_target = target + ".tmp"
+            df.to_parquet(tmp_target, index=False)
+            os.replace(tmp_target, target)
+        except Exception as e:
+            print(f"Error converting {member}: {e}")
+            failed += 1
+            continue
+        written += 1
+
+    # Marker lets re-runs skip days that are already complete; a day with failures is retried next run
+    if failed:
+        print(f"--- {day_path}: {failed} contracts failed, not marked complete ---")
+    else:
+        with open(marker, "w") as f:
+            f.write(str(written))
+
+    return written
+
+
+def ingest_monthly_zip(month_zip_path, symbol="NIFTY", overwrite=False):
+    """ Ingest every trading day of one monthly ZIP; returns (days, contracts) written """
+    total_days = 0
+    total_files = 0
+
+    print(f"Ingesting {month_zip_path}")
+    with zipfile.ZipFile(month_zip_path, 'r') as outer_zip:
+        for inner_name in outer_zip.namelist():
+            base_name = os.path.basename(inner_name)
+            if not (base_name.startswith("GFDLNFO_TICK_OPTIONS_") and base_name.endswith(".zip")):
+                continue
+
+            # GFDLNFO_TICK_OPTIONS_30012024[...].zip -> 30012024
+            date_digits = base_name[len("GFDLNFO_TICK_OPTIONS_"):][:8]
+            try:
+                date = datetime.strptime(date_digits, "%d%m%Y")
+            except ValueError:
+                continue
+
+            day_path = get_day_path(symbol, date)
+            if not overwrite and os.path.exists(os.path.join(day_path, DONE_MARKER)):
+                continue
+
+            date_folder = f"GFDLNFO_TICK_OPTIONS_{date_digits}"
+            with outer_zip.open(inner_name) as inner_zip_file_obj:
+                with zipfile.ZipFile(inner_zip_file_obj) as inner_zip:
+                    total_files += ingest_inner_zip(inner_zip, date_folder, day_path)
+            total_days += 1
+
+    return total_days, total_files
+
+
+def _init_worker(dest):
+    # Workers started with spawn re-import this module, so the store root is passed in explicitly
+    global store_folder
+    store_folder = dest
+
+
+def ingest_archive(source_folder=base_folder, symbol="NIFTY", years=None, overwrite=False, max_workers=1):
+    """ One-time conversion of the nested ZIP archive into the Parquet store, one monthly ZIP per worker """
+    month_zip_paths = [path for _, path in list_monthly_zips(source_folder, symbol, years)]
+    total_days = 0
+    total_files = 0
+
+    if max_workers <= 1:
+        counts = (ingest_monthly_zip(path, symbol, overwrite) for path in month_zip_paths)
+        for days, files in counts:
+            total_days += days
+            total_files += files
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker, initargs=(store_folder,)) as pool:
+            counts = pool.map(ingest_monthly_zip, month_zip_paths,
+                              [symbol] * len(month_zip_paths), [overwrite] * len(month_zip_paths))
+            for days, files in counts:
+                total_days += days
+                total_files += files
+
+    print(f"--- Ingest complete: {total_days} days, {total_files} contracts ---")
+    return total_days, total_files
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert the option tick ZIP archive into a Parquet store")
+    parser.add_argument("--source", default=base_folder, help="Root of the NIFTY<year>/<MON_YYYY>.zip tree")
+    parser.add_argument("--dest", default=store_folder, help="Root of the Parquet store")
+    parser.add_argument("--symbol", default="NIFTY")
+    parser.add_argument("--year", action="append", help="Only ingest these years (repeatable)")
+    parser.add_argument("--overwrite", action="store_true", help="Re-ingest days that are already complete")
+    parser.add_argument("--workers", type=int, default=1, help="Monthly ZIPs ingested in parallel")
+    args = parser.parse_args()
+
+    store_folder = args.dest
+    ingest_archive(args.source, args.symbol, args.year, args.overwrite, args.workers)
@@ -0,0 +1,123 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+def dataframe_nbytes(df) -> int:
+    """Deep memory footprint of a DataFrame (object columns included)"""
+    try:
+        return int(df.memory_usage(deep=True).sum())
+    except AttributeError:
+        return 0
+
+
+class LRUCache:
+    """Thread-safe LRU cache bounded by entry count and/or a byte budget.
+
+    `sizeof` measures each value when it is stored; `on_evict` is called with
+    (key, value) for every entry dropped so owners can release resources such
+    as open file handles.
+    """
+
+    def __init__(
+        self,
+        max_items: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        sizeof: Optional[Callable[[Any], int]] = None,
+        on_evict: Optional[Callable[[Hashable, Any], None]] = None
+    ):
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof or (lambda value: 0)
+        self.on_evict = on_evict
+
+        self._data = OrderedDict()
+        self._sizes = {}
+        self._lock = threading.RLock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value and mark it as most recently used"""
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+            return default
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """Store a value, evicting least recently used entries to stay within budget"""
+        size = self.sizeof(value)
+        with self._lock:
+            if key in self._data:
+                self._remove(key, notify=False)
+
+            # A single value larger than the whole budget is never cached
+            if self.max_bytes is not None and size > self.max_bytes:
+                if self.on_evict:
+                    self.on_evict(key, value)
+                self.evictions += 1
+                return
+
+            self._data[key] = value
+            self._sizes[key] = size
+            self.current_bytes += size
+            self._evict_overflow()
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """Remove an entry without calling on_evict"""
+        with self._lock:
+            if key not in self._data:
+                return default
+            value = self._data[key]
+            self._remove(key, notify=False)
+            return value
+
+    def clear(self) -> None:
+        """Drop every entry, calling on_evict for each"""
+        with self._lock:
+            for key in list(self._data):
+                self._remove(key, notify=True)
+
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss/eviction counters and current occupancy"""
+        with self._lock:
+            return {
+                "items": len(self._data),
+                "bytes": self.current_bytes,
+                "max_items": self.max_items,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions
+            }
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._data
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
+
+    def _evict_overflow(self) -> None:
+        while self._data and (
+            (self.max_items is not None and len(self._data) > self.max_items) or
+            (self.max_bytes is not None and self.current_bytes > self.max_bytes)
+        ):
+            oldest_key = next(iter(self._data))
+            self._remove(oldest_key, notify=True)
+            self.evictions += 1
+
+    def _remove(self, key: Hashable, notify: bool) -> None:
+        value = self._data.pop(key)
+        self.current_bytes -= self._sizes.pop(key, 0)
+        if notify and self.on_evict:
+            try:
+                self.on_evict(key, value)
+            except Exception as e:
+                print(f"Error evicting cache entry {key}: {e}")
@@ -0,0 +1,38 @@
+import numpy as np
+import pandas as pd
+
+# Option tick frames are parsed once when they are loaded: the 'HH:MM:SS' time
+# column gets an integer companion holding seconds since midnight, ticks are in
+# time order, and the numeric columns are read-only because the same frame is
+# shared through the loader caches.
+
+SECONDS_COLUMN = 'seconds'
+
+
+def time_to_seconds(times: pd.Series) -> np.ndarray:
+    """Seconds since midnight for a Series of 'HH:MM:SS' strings"""
+    deltas = pd.to_timedelta(times.astype(str))
+    return deltas.to_numpy().astype('timedelta64[s]').astype(np.int32)
+
+
+def freeze_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Same frame backed by non-writeable arrays, so cached data cannot be modified in place"""
+    columns = {}
+    for column in df.columns:
+        values = df[column]
+        if isinstance(values.dtype, np.dtype):
+            values = values.to_numpy(copy=True)
+            values.flags.writeable = False
+        columns[column] = values
+    return pd.DataFrame(columns, copy=False)
+
+
+def prepare_tick_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Normalise a raw option tick frame: 'time' column, integer seconds, sorted by time, read-only"""
+    df = df.rename(columns={'Time': 'time'})
+    if 'time' in df.columns:
+        if SECONDS_COLUMN not in df.columns:
+            df[SECONDS_COLUMN] = time_to_seconds(df['time'])
+        if not df[SECONDS_COLUMN].is_monotonic_increasing:
+            df = df.sort_values(SECONDS_COLUMN, kind='stable').reset_index(drop=True)
+    return freeze_frame(df)
@@ -1,5 +1,9 @@
 import zipfile
 import os
+import io
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 from datetime import datetime
 import pandas as pd
 
@@ -40,33 +44,144 @@ import pandas as pd
 
 #     return None  
 
-from functools import lru_cache
+from utils.cache import LRUCache, dataframe_nbytes
+from utils.ticks import prepare_tick_frame
+from archive_index import ArchiveIndex, read_member
 
 base_folder = r"D:\FNODATA"
-zip_cache = {}  # Cache for opened ZIP files
-inner_zip_cache = {}  # Cache for inner ZIP file names
-csv_cache = {}  # Cache for CSV DataFrames
+archive_index = None  # Optional ArchiveIndex, enabled with use_archive_index()
+
+# Cache limits, overridable per worker through the environment
+CSV_CACHE_MAX_BYTES = int(os.getenv("ZIP_READ_CSV_CACHE_MB", "512")) * 1024 * 1024
+ZIP_CACHE_MAX_OPEN = int(os.getenv("ZIP_READ_MAX_OPEN_ZIPS", "8"))
+INNER_ZIP_CACHE_MAX_ITEMS = 10000
+MAX_WORKERS = int(os.getenv("ZIP_READ_MAX_WORKERS", str(min(8, os.cpu_count() or 1))))
+
+open_zip_lock = threading.Lock()  # Stops two threads from opening the same monthly ZIP twice
+
+class SharedZip:
+    """
+    A cached monthly ZipFile shared by concurrent readers. Eviction only retires it;
+    the file is closed once the last reader has released it.
+    """
+
+    def __init__(self, zip_file):
+        self.zip_file = zip_file
+        self.users = 0
+        self.retired = False
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """ Register a reader; False once the handle has been closed """
+        with self.lock:
+            if self.retired and self.users == 0:
+                return False
+            self.users += 1
+            return True
+
+    def release(self):
+        with self.lock:
+            self.users -= 1
+            close = self.retired and self.users == 0
+        if close:
+            self.zip_file.close()
+
+    def retire(self):
+        with self.lock:
+            self.retired = True
+            close = self.users == 0
+        if close:
+            self.zip_file.close()
+
+def close_zip(month_zip_path, shared_zip):
+    """ Release the file handle of an evicted monthly ZIP once no reader is using it """
+    shared_zip.retire()
+
+zip_cache = LRUCache(max_items=ZIP_CACHE_MAX_OPEN, on_evict=close_zip)  # Cache for opened ZIP files
+inner_zip_cache = LRUCache(max_items=INNER_ZIP_CACHE_MAX_ITEMS)  # Cache for inner ZIP file names
+csv_cache = LRUCache(max_bytes=CSV_CACHE_MAX_BYTES, sizeof=dataframe_nbytes)  # Cache for CSV DataFrames
+
+def get_cache_stats():
+    """ Hit/miss/eviction counters and occupancy of every zip_read cache """
+    return {
+        "zip_cache": zip_cache.stats(),
+        "inner_zip_cache": inner_zip_cache.stats(),
+        "csv_cache": csv_cache.stats()
+    }
+
+def clear_caches():
+    """ Drop all cached DataFrames and close every open ZIP handle """
+    csv_cache.clear()
+    inner_zip_cache.clear()
+    zip_cache.clear()
+
+def use_archive_index(path=None):
+    """ Resolve members through the prebuilt archive index instead of scanning ZIP listings """
+    global archive_index
+    archive_index = ArchiveIndex(path)
+    return archive_index
 
 def get_monthly_zip(year, month_folder):
-    """ Open the monthly ZIP file and cache it """
+    """ Open the monthly ZIP file and cache it; use as a context manager """
     month_zip_path = os.path.join(base_folder, "NIFTY"+year, f"{month_folder}.zip")
     print("======",month_zip_path)
-    if month_zip_path not in zip_cache:
-        if not os.path.exists(month_zip_path):
-            return None
-        zip_cache[month_zip_path] = zipfile.ZipFile(month_zip_path, 'r')
-    
-    return zip_cache[month_zip_path]
+    return get_zip_by_path(month_zip_path)
+
+def acquire_zip(month_zip_path):
+    """ Cached SharedZip of a monthly ZIP with one reader registered, or None when the file is missing """
+    while True:
+        shared_zip = zip_cache.get(month_zip_path)
+        if shared_zip is None:
+            with open_zip_lock:
+                shared_zip = zip_cache.get(month_zip_path)
+                if shared_zip is None:
+                    if not os.path.exists(month_zip_path):
+                        return None
+                    shared_zip = SharedZip(zipfile.ZipFile(month_zip_path, 'r'))
+                    shared_zip.acquire()  # before put(), which may evict it straight away
+                    zip_cache.put(month_zip_path, shared_zip)
+                    return shared_zip
+        if shared_zip.acquire():
+            return shared_zip
+        # Closed by an eviction between get() and acquire(); look it up again
+
+@contextmanager
+def get_zip_by_path(month_zip_path):
+    """
+    Borrow the cached handle of a monthly ZIP (None when the file is missing). The
+    handle stays open for the whole with-block even if the cache evicts it meanwhile.
+    """
+    shared_zip = acquire_zip(month_zip_path)
+    if shared_zip is None:
+        yield None
+        return
+    try:
+        yield shared_zip.zip_file
+    finally:
+        shared_zip.release()
+
+def archive_version(start_date, end_date):
+    """ Stamp (path, mtime, size) of the monthly ZIPs covering a YYYY-MM-DD window """
+    parts = []
+    for month in pd.period_range(start_date, end_date, freq='M'):
+        month_zip_path = os.path.join(base_folder, f"NIFTY{month.year}", f"{month.strftime('%b_%Y').upper()}.zip")
+        if os.path.exists(month_zip_path):
+            stat = os.stat(month_zip_path)
+            parts.append(f"{month_zip_path}:{stat.st_mtime_ns}:{stat.st_size}")
+        else:
+            parts.append(f"{month_zip_path}:-")
+    return ",".join(parts)
 
 def get_inner_zip_name(outer_zip, date_folder):
     """ Cache inner ZIP file names to reduce redundant lookups """
-    if date_folder in inner_zip_cache:
-        return inner_zip_cache[date_folder]
+    inner_zip_file = inner_zip_cache.get(date_folder)
+    if inner_zip_file is not None:
+        return inner_zip_file
 
     inner_zip_file = next((file for file in outer_zip.namelist() if file.startswith(date_folder) and file.endswith('.zip')), None)
     
     if inner_zip_file:
-        inner_zip_cache[date_folder] = inner_zip_file
+        inner_zip_cache.put(date_folder, inner_zip_file)
     return inner_zip_file
 
 def fetch_csv_from_zip(target_csv_name, date_str, symbol):
@@ -79,32 +194,137 @@ def fetch_csv_from_zip(target_csv_name, date_str, symbol):
 
     # Check cache for already extracted CSV
     cache_key = f"{date_folder}_{target_csv_name}"
-    if cache_key in csv_cache:
-        return csv_cache[cache_key]
+    cached_df = csv_cache.get(cache_key)
+    if cached_df is not None:
+        return cached_df
+
+    # Jump straight to the CSV bytes when the archive index knows this member
+    if archive_index is not None:
+        entry = archive_index.lookup(date, target_csv_name)
+        if entry is not None:
+            df = fetch_indexed_csv(entry)
+            if df is not None:
+                csv_cache.put(cache_key, df)
+                return df
 
     # Open monthly ZIP file
-    outer_zip = get_monthly_zip(year_folder, month_folder)
-    if not outer_zip:
-        return None
-
-    # Get inner ZIP file name
-    inner_zip_file = get_inner_zip_name(outer_zip, date_folder)
-    if not inner_zip_file:
-        return None
-
-    # Open inner ZIP file
-    with outer_zip.open(inner_zip_file) as inner_zip_file_obj:
-        with zipfile.ZipFile(inner_zip_file_obj) as inner_zip:
-            target_csv_path = f"{date_folder}/Options/{target_csv_name}.NFO.csv"
-            if target_csv_path in inner_zip.namelist():
-                try:
-                    with inner_zip.open(target_csv_path) as f:
-                        df = pd.read_csv(f)
-                        df.rename(columns={'Time': 'time'}, inplace=True)
-                        csv_cache[cache_key] = df  # Store in cache
-                        return df
-                except Exception as e:
-                    print(f"Error reading CSV: {e}")
+    with get_monthly_zip(year_folder, month_folder) as outer_zip:
+        if not outer_zip:
+            return None
+
+        # Get inner ZIP file name
+        inner_zip_file = get_inner_zip_name(outer_zip, date_folder)
+        if not inner_zip_file:
+            return None
+
+        # Open inner ZIP file
+        with outer_zip.open(inner_zip_file) as inner_zip_file_obj:
+            with zipfile.ZipFile(inner_zip_file_obj) as inner_zip:
+                target_csv_path = f"{date_folder}/Options/{target_csv_name}.NFO.csv"
+                if target_csv_path in inner_zip.namelist():
+                    try:
+                        with inner_zip.open(target_csv_path) as f:
+                            df = prepare_tick_frame(pd.read_csv(f))
+                            csv_cache.put(cache_key, df)  # Store in cache
+                            return df
+                    except Exception as e:
+                        print(f"Error reading CSV: {e}")
+
+    return None
+
+def read_day(date_str, target_csv_names=None):
+    """ Read the given option CSVs (every option CSV when None) of one trading day, opening its inner ZIP once """
+    date = datetime.strptime(date_str, "%d/%m/%Y")
+    date_folder = f"GFDLNFO_TICK_OPTIONS_{date.strftime('%d%m%Y')}"
+    frames = {}
+
+    with get_monthly_zip(str(date.year), date.strftime("%b_%Y").upper()) as outer_zip:
+        if not outer_zip:
+            return frames
+        inner_zip_file = get_inner_zip_name(outer_zip, date_folder)
+        if not inner_zip_file:
+            return frames
+
+        prefix = f"{date_folder}/Options/"
+        with outer_zip.open(inner_zip_file) as inner_zip_file_obj:
+            with zipfile.ZipFile(inner_zip_file_obj) as inner_zip:
+                members = set(inner_zip.namelist())
+                if target_csv_names is None:
+                    target_csv_names = [m[len(prefix):-len(".NFO.csv")] for m in sorted(members)
+                                        if m.startswith(prefix) and m.endswith(".NFO.csv")]
+
+                for target_csv_name in target_csv_names:
+                    target_csv_path = f"{prefix}{target_csv_name}.NFO.csv"
+                    if target_csv_path not in members:
+                        continue
+                    try:
+                        with inner_zip.open(target_csv_path) as f:
+                            df = prepare_tick_frame(pd.read_csv(f))
+                        frames[target_csv_name] = df
+                    except Exception as e:
+                        print(f"Error reading CSV: {e}")
+
+    return frames
+
+def load_days(date_strs, target_csv_names=None, max_workers=None, use_processes=False):
+    """
+    read_day over many trading days on a worker pool, returned as {date_str: {name: df}}
+    in date order. target_csv_names is either one list for every day or a list per day.
+    Threads share the open ZIP handles; processes open their own and suit CPU-bound parsing.
+    """
+    date_strs = list(date_strs)
+    if target_csv_names is None or (target_csv_names and isinstance(target_csv_names[0], str)):
+        target_csv_names = [target_csv_names] * len(date_strs)
+    days = sorted(zip(date_strs, target_csv_names), key=lambda day: datetime.strptime(day[0], "%d/%m/%Y"))
+    date_strs = [date_str for date_str, _ in days]
+    targets = [names for _, names in days]
+
+    max_workers = min(max_workers or MAX_WORKERS, len(date_strs))
+    if max_workers <= 1:
+        return {date_str: read_day(date_str, names) for date_str, names in zip(date_strs, targets)}
+
+    pool_class = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+    with pool_class(max_workers=max_workers) as pool:
+        # map() yields in submission order, so the result stays in date order
+        return dict(zip(date_strs, pool.map(read_day, date_strs, targets)))
+
+def fetch_many_from_zip(requests, max_workers=None, use_processes=False):
+    """ Bulk-load (target_csv_name, date_str, symbol) requests, reading the trading days in parallel """
+    results = {}
+    pending = {}  # date_str -> set of target CSV names still to read
+    for target_csv_name, date_str, symbol in requests:
+        date_folder = f"GFDLNFO_TICK_OPTIONS_{datetime.strptime(date_str, '%d/%m/%Y').strftime('%d%m%Y')}"
+        cached_df = csv_cache.get(f"{date_folder}_{target_csv_name}")
+        if cached_df is not None:
+            results[(target_csv_name, date_str)] = cached_df
+        else:
+            pending.setdefault(date_str, set()).add(target_csv_name)
+
+    if not pending:
+        return results
+
+    days = list(pending)
+    day_frames = load_days(days, [sorted(pending[d]) for d in days], max_workers, use_processes)
+    for date_str, frames in day_frames.items():
+        date_folder = f"GFDLNFO_TICK_OPTIONS_{datetime.strptime(date_str, '%d/%m/%Y').strftime('%d%m%Y')}"
+        for target_csv_name, df in frames.items():
+            csv_cache.put(f"{date_folder}_{target_csv_name}", df)
+            results[(target_csv_name, date_str)] = df
+
+    return results
+
+def fetch_indexed_csv(entry):
+    """ Read a CSV located through the archive index without listing either ZIP """
+    with get_zip_by_path(entry["outer_path"]) as outer_zip:
+        if not outer_zip:
+            return None
+
+        try:
+            with outer_zip.open(entry["inner_name"]) as inner_zip_file_obj:
+                data = read_member(inner_zip_file_obj, entry)
+            return prepare_tick_frame(pd.read_csv(io.BytesIO(data)))
+        except Exception as e:
+            print(f"Error reading indexed CSV: {e}")
 
     return None
 